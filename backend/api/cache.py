@@ -0,0 +1,61 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+
+def generation_key(namespace):
+    return f'api:generation:{namespace}'
+
+
+def get_generation(namespace):
+    return cache.get_or_set(generation_key(namespace), 1, None)
+
+
+def bump_generation(namespace):
+    try:
+        cache.incr(generation_key(namespace))
+    except ValueError:
+        cache.set(generation_key(namespace), 1, None)
+
+
+def response_cache_key(namespace, request):
+    """Ключ ответа: путь и отсортированные параметры запроса."""
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    digest = hashlib.md5(
+        f'{request.path}?{query}'.encode()
+    ).hexdigest()
+    return f'api:response:{namespace}:{get_generation(namespace)}:{digest}'
+
+
+class AnonymousCacheMixin:
+    """
+    Кеширует list и retrieve для анонимных пользователей.
+    Ответы живут в своём пространстве имён; сигналы моделей
+    увеличивают его поколение, и старые ключи перестают читаться.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def _cached(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = response_cache_key(self.cache_namespace, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,231 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from heapq import merge
+from itertools import islice
+
+import redis
+from django.conf import settings
+from django.db.models import Q
+
+from recipes.models import Dish
+from users.models import Chef, ChefConnection
+
+# Авторы, чьи блюда сейчас подмешиваются при чтении, а не раздаются.
+CELEBRITIES_KEY = 'feed:celebrities'
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """
+    Клиент Redis для лент. URL вида fakeredis:// подключает
+    процессный стенд fakeredis (для тестов и локального запуска).
+    """
+    url = settings.FEED_REDIS_URL
+    if url.startswith('fakeredis://'):
+        import fakeredis
+        return fakeredis.FakeRedis()
+    return redis.Redis.from_url(url)
+
+
+def timeline_key(user_id):
+    return f'feed:{user_id}'
+
+
+def empty_timeline_key(user_id):
+    """Метка собранной, но пустой ленты: пустой sorted set Redis не хранит."""
+    return f'feed:{user_id}:empty'
+
+
+def _score(dish):
+    return dish.created_at.timestamp()
+
+
+def _order(entry):
+    """Порядок ленты: (метка времени, id) по убыванию."""
+    pk, score = entry
+    return -score, -pk
+
+
+def _trim(pipeline, user_id):
+    pipeline.zremrangebyrank(
+        timeline_key(user_id), 0, -settings.FEED_TIMELINE_SIZE - 1
+    )
+
+
+def _add(pipeline, user_id, mapping):
+    pipeline.zadd(timeline_key(user_id), mapping)
+    pipeline.delete(empty_timeline_key(user_id))
+    _trim(pipeline, user_id)
+
+
+def _built_timelines(client, user_ids):
+    """
+    Пользователи, чья лента уже собрана. Остальным ничего не
+    дописывается: неполная лента не пересобралась бы при чтении.
+    """
+    pipeline = client.pipeline(transaction=False)
+    for user_id in user_ids:
+        pipeline.exists(timeline_key(user_id), empty_timeline_key(user_id))
+    return [
+        user_id for user_id, built in zip(user_ids, pipeline.execute())
+        if built
+    ]
+
+
+def _follower_batches(chef_id, batch_size):
+    follower_ids = ChefConnection.objects.filter(
+        following_id=chef_id
+    ).values_list('follower_id', flat=True).iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(follower_ids, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def is_celebrity(chef):
+    """Блюда популярных авторов не раздаются, а подмешиваются при чтении."""
+    return chef.followers_count > settings.FEED_CELEBRITY_THRESHOLD
+
+
+def push_to_followers(dish, batch_size=1000):
+    """Fan-out on write: добавляет блюдо в ленты подписчиков автора."""
+    client = get_redis()
+    for batch in _follower_batches(dish.creator_id, batch_size):
+        pipeline = client.pipeline(transaction=False)
+        for follower_id in _built_timelines(client, batch):
+            _add(pipeline, follower_id, {dish.pk: _score(dish)})
+        pipeline.execute()
+
+
+def update_celebrity_status(chef_id, batch_size=1000):
+    """
+    Отмечает переход автора через FEED_CELEBRITY_THRESHOLD и сбрасывает
+    ленты его подписчиков: при чтении они пересоберутся уже с раздачей
+    или подмешиванием его блюд. Возвращает, популярен ли автор.
+    """
+    chef = Chef.objects.only('followers_count').filter(pk=chef_id).first()
+    celebrity = chef is not None and is_celebrity(chef)
+    client = get_redis()
+    if celebrity:
+        changed = client.sadd(CELEBRITIES_KEY, chef_id)
+    else:
+        changed = client.srem(CELEBRITIES_KEY, chef_id)
+    if changed and chef is not None:
+        for batch in _follower_batches(chef_id, batch_size):
+            client.delete(*(
+                key for follower_id in batch for key in (
+                    timeline_key(follower_id),
+                    empty_timeline_key(follower_id)
+                )
+            ))
+    return celebrity
+
+
+def add_chef_to_timeline(user_id, chef_id):
+    """После подписки подтягивает в ленту последние блюда автора."""
+    dishes = Dish.objects.filter(creator_id=chef_id).order_by(
+        '-created_at'
+    )[:settings.FEED_TIMELINE_SIZE]
+    mapping = {dish.pk: _score(dish) for dish in dishes.only('created_at')}
+    client = get_redis()
+    if not mapping or not _built_timelines(client, [user_id]):
+        return
+    pipeline = client.pipeline(transaction=False)
+    _add(pipeline, user_id, mapping)
+    pipeline.execute()
+
+
+def remove_chef_from_timeline(user_id, chef_id):
+    """После отписки убирает из ленты блюда автора."""
+    key = timeline_key(user_id)
+    dish_ids = [int(pk) for pk in get_redis().zrange(key, 0, -1)]
+    stale = list(Dish.objects.filter(
+        pk__in=dish_ids, creator_id=chef_id
+    ).values_list('pk', flat=True))
+    if stale:
+        get_redis().zrem(key, *stale)
+
+
+def rebuild_timeline(user_id):
+    """Восстанавливает ленту pull-запросом, если ключа в Redis нет."""
+    dishes = Dish.objects.filter(
+        creator__followers__follower_id=user_id,
+        creator__followers_count__lte=settings.FEED_CELEBRITY_THRESHOLD
+    ).order_by('-created_at', '-pk').only('created_at')[
+        :settings.FEED_TIMELINE_SIZE
+    ]
+    mapping = {dish.pk: _score(dish) for dish in dishes}
+    if mapping:
+        get_redis().zadd(timeline_key(user_id), mapping)
+    else:
+        get_redis().set(empty_timeline_key(user_id), 1)
+
+
+def _read_timeline(key, limit, before):
+    """
+    Страница из Redis после курсора (score, id). Равные метки Redis
+    сортирует по строковому id, поэтому группа равных меток на
+    границах страницы дочитывается целиком и сортируется здесь.
+    """
+    client = get_redis()
+    entries = set()
+    upper = '+inf'
+    if before is not None:
+        score, pk = before
+        upper = f'({score}'
+        entries.update(
+            (int(member), value)
+            for member, value in client.zrangebyscore(
+                key, score, score, withscores=True
+            )
+            if int(member) < pk
+        )
+    page = client.zrevrangebyscore(
+        key, upper, '-inf', start=0, num=limit, withscores=True
+    )
+    if len(page) == limit:
+        last = page[-1][1]
+        page += client.zrangebyscore(key, last, last, withscores=True)
+    entries.update((int(member), value) for member, value in page)
+    return sorted(entries, key=_order)[:limit]
+
+
+def get_feed_page(user, limit, before=None):
+    """
+    Страница ленты: [(dish_id, score)] по убыванию (времени, id),
+    строго после курсора before = (score, id).
+    Лента из Redis сливается с pull-выборкой по популярным авторам;
+    блюдо, попавшее в обе (автор только что стал популярным), берётся
+    один раз.
+    """
+    key = timeline_key(user.pk)
+    if not get_redis().exists(key, empty_timeline_key(user.pk)):
+        rebuild_timeline(user.pk)
+    pushed = _read_timeline(key, limit, before)
+    pulled = Dish.objects.filter(
+        creator__followers__follower=user,
+        creator__followers_count__gt=settings.FEED_CELEBRITY_THRESHOLD
+    )
+    if before is not None:
+        score, pk = before
+        created_at = datetime.fromtimestamp(score, tz=timezone.utc)
+        pulled = pulled.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    pulled = [
+        (dish.pk, _score(dish))
+        for dish in pulled.order_by('-created_at', '-pk').only(
+            'created_at'
+        )[:limit]
+    ]
+    page = []
+    seen = set()
+    for entry in merge(pushed, pulled, key=_order):
+        if entry[0] in seen:
+            continue
+        seen.add(entry[0])
+        page.append(entry)
+        if len(page) == limit:
+            break
+    return page
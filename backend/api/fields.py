@@ -0,0 +1,135 @@
+import base64
+import binascii
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+from .images import RENDITION_SIZES
+from .validators import format_ids, missing_ids
+
+
+class ImageRenditionsField(serializers.Field):
+    """
+    Ссылки на уменьшенные копии картинки и размытую заглушку.
+    Пока копии не готовы, возвращает пустой словарь.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+        request = self.context.get('request')
+        data = {'placeholder': value.get('placeholder')}
+        for size_name in RENDITION_SIZES:
+            data[size_name] = {}
+            for extension, path in value.get(size_name, {}).items():
+                url = default_storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                data[size_name][extension] = url
+        return data
+
+
+class ImageUploadField(serializers.ImageField):
+    """
+    Картинка из multipart/form-data или строкой Base64 (data URI) в JSON.
+    Размер и габариты проверяются по заголовкам до полного декодирования.
+    """
+    default_error_messages = {
+        'too_large': 'Image must not exceed {max_size} bytes.',
+        'too_big': 'Image must not exceed {max_dimension}px per side.',
+        'invalid_base64': 'Invalid Base64 image.',
+    }
+    chunk_size = 64 * 1024
+
+    def to_internal_value(self, data):
+        decoded = isinstance(data, str)
+        if decoded:
+            data = self._decode_base64(data)
+        elif not hasattr(data, 'size'):
+            self.fail('invalid')
+        try:
+            if data.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+                self.fail(
+                    'too_large', max_size=settings.IMAGE_UPLOAD_MAX_SIZE
+                )
+            self._check_dimensions(data)
+            return super().to_internal_value(data)
+        except Exception:
+            # Временный файл из Base64 больше никому не нужен.
+            if decoded:
+                data.close()
+            raise
+
+    def _decode_base64(self, data):
+        header, _, encoded = data.rpartition(';base64,')
+        extension = header.rpartition('/')[2] or 'jpg'
+        # Переносы строк и пробелы допустимы в Base64, но не в validate=True.
+        encoded = ''.join(encoded.split())
+        if len(encoded) * 3 // 4 > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.fail('too_large', max_size=settings.IMAGE_UPLOAD_MAX_SIZE)
+        upload = TemporaryUploadedFile(
+            f'{uuid4().hex}.{extension}', f'image/{extension}', 0, None
+        )
+        # Кратные 4 куски декодируются независимо, без второй полной копии.
+        step = self.chunk_size * 4
+        try:
+            for start in range(0, len(encoded), step):
+                upload.write(
+                    base64.b64decode(encoded[start:start + step], validate=True)
+                )
+        except (binascii.Error, ValueError):
+            upload.close()
+            self.fail('invalid_base64')
+        upload.size = upload.tell()
+        upload.seek(0)
+        return upload
+
+    def _check_dimensions(self, data):
+        max_dimension = settings.IMAGE_MAX_DIMENSION
+        try:
+            with Image.open(data) as image:
+                width, height = image.size
+        except (OSError, Image.DecompressionBombError):
+            self.fail('invalid_image')
+        finally:
+            data.seek(0)
+        if max(width, height) > max_dimension:
+            self.fail('too_big', max_dimension=max_dimension)
+
+
+class PrimaryKeyListField(serializers.ListField):
+    """
+    Список id из queryset. В отличие от PrimaryKeyRelatedField(many=True)
+    проверяется одним запросом (см. missing_ids), возвращает список id.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Objects do not exist: {ids}.',
+    }
+
+    def __init__(self, queryset, cache_namespace=None, **kwargs):
+        kwargs['child'] = serializers.IntegerField(min_value=1)
+        super().__init__(**kwargs)
+        self.queryset = queryset
+        self.cache_namespace = cache_namespace
+
+    def to_internal_value(self, data):
+        ids = super().to_internal_value(data)
+        missing = missing_ids(
+            self.queryset.all(), ids, self.cache_namespace
+        )
+        if missing:
+            self.fail('does_not_exist', ids=format_ids(missing))
+        return ids
+
+    def to_representation(self, value):
+        if hasattr(value, 'all'):
+            value = value.all()
+        return [getattr(item, 'pk', item) for item in value]
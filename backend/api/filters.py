@@ -1,28 +1,50 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, TrigramSimilarity
+)
+from django.db import connection
+from django.db.models import F, Q
 from django_filters import rest_framework as filters
 
-from recipes.models import Dish, Product
+from recipes.models import Dish, Meal
+from .nutrition import annotate_calories
 
 User = get_user_model()
 
 
-class ProductFilter(filters.FilterSet):
-    name = filters.CharFilter(lookup_expr='istartswith')
-
-    class Meta:
-        model = Product
-        fields = ('name',)
-
-
 class DishFilter(filters.FilterSet):
     categories = filters.NumberFilter(field_name='categories__id')
     is_bookmarked = filters.BooleanFilter(method='filter_is_bookmarked')
     is_in_meal_plan = filters.BooleanFilter(method='filter_is_in_meal_plan')
     creator = filters.NumberFilter(field_name='creator__id')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Dish
-        fields = ('categories', 'is_bookmarked', 'is_in_meal_plan', 'creator')
+        fields = (
+            'categories', 'is_bookmarked', 'is_in_meal_plan', 'creator',
+            'search'
+        )
+
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск с ранжированием и триграммами для опечаток.
+        Вне PostgreSQL (например, SQLite в тестах) — icontains.
+        """
+        if connection.vendor != 'postgresql':
+            return queryset.filter(
+                Q(title__icontains=value) | Q(description__icontains=value)
+            )
+        query = SearchQuery(
+            value, config=settings.SEARCH_CONFIG, search_type='websearch'
+        )
+        return queryset.filter(
+            Q(search_vector=query) | Q(title__trigram_similar=value)
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            similarity=TrigramSimilarity('title', value)
+        ).order_by('-rank', '-similarity', '-created_at')
 
     def filter_is_bookmarked(self, queryset, name, value):
         user = self.request.user
@@ -35,3 +57,20 @@ class DishFilter(filters.FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(meal_plans__user=user)
         return queryset
+
+
+class MealFilter(filters.FilterSet):
+    chef = filters.NumberFilter(field_name='chef__id')
+    difficulty = filters.ChoiceFilter(choices=Meal.DIFFICULTY_CHOICES)
+    calories_min = filters.NumberFilter(method='filter_calories')
+    calories_max = filters.NumberFilter(method='filter_calories')
+
+    class Meta:
+        model = Meal
+        fields = ('chef', 'difficulty', 'calories_min', 'calories_max')
+
+    def filter_calories(self, queryset, name, value):
+        if 'calories' not in queryset.query.annotations:
+            queryset = annotate_calories(queryset)
+        lookup = 'gte' if name == 'calories_min' else 'lte'
+        return queryset.filter(**{f'calories__{lookup}': value})
@@ -0,0 +1,55 @@
+import base64
+import io
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps
+
+# Модель -> (поле с исходником, JSON-поле с производными картинками).
+RENDITION_FIELDS = {
+    'recipes.Dish': ('image', 'image_renditions'),
+    'users.Chef': ('avatar', 'avatar_renditions'),
+}
+RENDITION_SIZES = {'small': 320, 'medium': 800}
+RENDITION_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+PLACEHOLDER_SIZE = 16
+
+
+def build_renditions(image_file):
+    """
+    Сохраняет уменьшенные копии в WebP и JPEG и крошечную размытую
+    заглушку в виде data URI. Возвращает описание для JSON-поля.
+    """
+    stem = PurePosixPath(image_file.name).stem
+    renditions = {'source': image_file.name}
+    with image_file.open('rb'), Image.open(image_file) as original:
+        image = ImageOps.exif_transpose(original).convert('RGB')
+    for size_name, width in RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((width, width))
+        renditions[size_name] = {}
+        for extension, pillow_format in RENDITION_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pillow_format, quality=80, optimize=True)
+            renditions[size_name][extension] = default_storage.save(
+                f'renditions/{stem}_{size_name}.{extension}',
+                ContentFile(buffer.getvalue())
+            )
+    placeholder = image.copy()
+    placeholder.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    placeholder.filter(ImageFilter.GaussianBlur(1)).save(
+        buffer, 'JPEG', quality=50
+    )
+    renditions['placeholder'] = (
+        'data:image/jpeg;base64,'
+        + base64.b64encode(buffer.getvalue()).decode()
+    )
+    return renditions
+
+
+def delete_renditions(renditions):
+    for size_name in RENDITION_SIZES:
+        for path in renditions.get(size_name, {}).values():
+            default_storage.delete(path)
@@ -0,0 +1,386 @@
+import io
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVector
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.services import rebuild_shopping_lists
+from recipes.models import (
+    Bookmark, Category, Dish, DishProduct, MealPlan, Product
+)
+from recipes.tasks import COUNTERS, reconcile_counter
+from users.models import ChefConnection
+from .load_catalogue import iter_records
+
+User = get_user_model()
+
+
+def model_columns(model, **overrides):
+    """
+    Колонки модели и значения по умолчанию для вставки в обход save():
+    auto_now, default и FileField обрабатываются как при обычной вставке.
+    """
+    instance = model(**overrides)
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    return (
+        [field.attname for field in fields],
+        [field.get_prep_value(field.pre_save(instance, True))
+         for field in fields]
+    )
+
+
+def copy_value(value):
+    """Значение в текстовом формате COPY."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n'
+    ).replace('\r', '\\r')
+
+
+def zipf_weights(rng, size, exponent):
+    """Степенное распределение популярности в случайном порядке id."""
+    weights = np.arange(1, size + 1, dtype=np.float64) ** -exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def unique_pairs(left, right, right_size):
+    """Уникальные пары (left, right), повторы отбрасываются."""
+    codes = np.unique(left.astype(np.int64) * right_size + right)
+    return codes // right_size, codes % right_size
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетическую нагрузку: авторов, блюда, составы, '
+        'закладки, план питания и подписки со степенным распределением '
+        'популярности. В PostgreSQL пишет через COPY, иначе bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--dishes', type=int, default=1_000_000)
+        parser.add_argument(
+            '--products-per-dish', type=int, nargs=2, default=(4, 12),
+            metavar=('MIN', 'MAX')
+        )
+        parser.add_argument('--bookmarks', type=int, default=500_000)
+        parser.add_argument('--meal-plans', type=int, default=200_000)
+        parser.add_argument('--follows', type=int, default=1_000_000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='показатель степенного распределения популярности'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=50_000)
+        parser.add_argument(
+            '--catalogue', default='prepared_base.json',
+            help='фикстура с ингредиентами, если таблица продуктов пуста'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='использовать bulk_create даже в PostgreSQL'
+        )
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='не пересчитывать счётчики и списки покупок'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = np.random.default_rng(options['seed'])
+        self.batch_size = options['batch_size']
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not options['no_copy']
+        )
+        self.zipf = options['zipf']
+        self.seed = options['seed']
+        self.started = time.monotonic()
+        self.total = 0
+
+        product_ids = self._ensure_products(Path(options['catalogue']))
+        user_ids = self._create_users(options['users'])
+        dish_ids = self._create_dishes(options['dishes'], user_ids)
+        self._create_dish_products(
+            dish_ids, product_ids, *options['products_per_dish']
+        )
+        self._create_dish_categories(dish_ids)
+        self._create_user_dish_pairs(
+            Bookmark, options['bookmarks'], user_ids, dish_ids
+        )
+        self._create_user_dish_pairs(
+            MealPlan, options['meal_plans'], user_ids, dish_ids
+        )
+        self._create_follows(options['follows'], user_ids)
+        if not options['skip_derived']:
+            self._update_derived(dish_ids)
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {self.total} rows in {elapsed:.1f}s '
+            f'({self.total / max(elapsed, 1e-6):.0f} rows/s)'
+        ))
+
+    def _write(self, model, columns, rows, timestamps=()):
+        """
+        Пишет кортежи значений колонок пачками, возвращает их число.
+        timestamps — сгенерированные поля auto_now/auto_now_add,
+        которые нужно сохранить и на пути bulk_create.
+        """
+        rows = iter(rows)
+        written = 0
+        while True:
+            batch = [row for _, row in zip(range(self.batch_size), rows)]
+            if not batch:
+                break
+            with transaction.atomic():
+                if self.use_copy:
+                    buffer = io.StringIO()
+                    for row in batch:
+                        buffer.write(
+                            '\t'.join(copy_value(value) for value in row)
+                        )
+                        buffer.write('\n')
+                    buffer.seek(0)
+                    with connection.cursor() as cursor:
+                        cursor.copy_expert(
+                            f'COPY {model._meta.db_table} '
+                            f'({", ".join(columns)}) FROM STDIN',
+                            buffer
+                        )
+                else:
+                    self._bulk_create(model, columns, batch, timestamps)
+            written += len(batch)
+        self.total += written
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{model._meta.label}: {written} rows '
+            f'({self.total / max(elapsed, 1e-6):.0f} rows/s overall)'
+        )
+        return written
+
+    def _bulk_create(self, model, columns, batch, timestamps):
+        """
+        bulk_create перезаписывает поля auto_now и auto_now_add текущим
+        временем, поэтому сгенерированные значения возвращаются
+        следующим bulk_update.
+        """
+        objs = model.objects.bulk_create(
+            [model(**dict(zip(columns, row))) for row in batch],
+            batch_size=1000
+        )
+        if not timestamps:
+            return
+        positions = [columns.index(name) for name in timestamps]
+        for obj, row in zip(objs, batch):
+            for name, position in zip(timestamps, positions):
+                setattr(obj, name, row[position])
+        model.objects.bulk_update(objs, timestamps, batch_size=1000)
+
+    def _new_ids(self, model, last_pk):
+        return np.fromiter(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            ).iterator(chunk_size=self.batch_size),
+            dtype=np.int64
+        )
+
+    def _last_pk(self, model):
+        last = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        return last or 0
+
+    def _ensure_products(self, path):
+        if not Product.objects.exists():
+            if not path.exists():
+                raise CommandError(f'File not found: {path}')
+            names = {
+                (record['fields']['name'],
+                 record['fields']['measurement_unit'])
+                for record in iter_records(path)
+                if record.get('model') == 'recipes.ingredient'
+            }
+            self._write(Product, ('name', 'unit'), sorted(names))
+        return np.fromiter(
+            Product.objects.values_list('pk', flat=True), dtype=np.int64
+        )
+
+    def _create_users(self, count):
+        last_pk = self._last_pk(User)
+        prefix = f'scale{self.seed}-{last_pk}-'
+        columns, defaults = model_columns(
+            User, password='!', first_name='Scale', last_name='Chef'
+        )
+        email, username = columns.index('email'), columns.index('username')
+
+        def rows():
+            for index in range(count):
+                row = list(defaults)
+                row[email] = f'{prefix}{index}@example.com'
+                row[username] = f'{prefix}{index}'
+                yield row
+
+        self._write(User, columns, rows())
+        return self._new_ids(User, last_pk)
+
+    def _create_dishes(self, count, user_ids):
+        last_pk = self._last_pk(Dish)
+        columns, defaults = model_columns(
+            Dish, description='Сгенерированное блюдо.',
+            image='dishes/scale.jpg', prep_time=30
+        )
+        positions = {
+            name: columns.index(name)
+            for name in ('title', 'creator_id', 'prep_time', 'created_at',
+                         'updated_at')
+        }
+        creators = user_ids[self.rng.choice(
+            len(user_ids), count,
+            p=zipf_weights(self.rng, len(user_ids), self.zipf)
+        )]
+        prep_times = self.rng.integers(5, 180, count)
+        # Блюда равномерно распределены по двум последним годам.
+        offsets = np.sort(self.rng.integers(0, 2 * 365 * 86400, count))[::-1]
+        now = timezone.now()
+
+        def rows():
+            for index in range(count):
+                row = list(defaults)
+                created = now - timedelta(seconds=int(offsets[index]))
+                row[positions['title']] = f'Блюдо {last_pk + index + 1}'
+                row[positions['creator_id']] = int(creators[index])
+                row[positions['prep_time']] = int(prep_times[index])
+                row[positions['created_at']] = created
+                row[positions['updated_at']] = created
+                yield row
+
+        self._write(
+            Dish, columns, rows(), timestamps=('created_at', 'updated_at')
+        )
+        return self._new_ids(Dish, last_pk)
+
+    def _create_dish_products(self, dish_ids, product_ids, low, high):
+        weights = zipf_weights(self.rng, len(product_ids), self.zipf)
+
+        def rows():
+            for start in range(0, len(dish_ids), self.batch_size):
+                dishes = dish_ids[start:start + self.batch_size]
+                sizes = self.rng.integers(low, high + 1, len(dishes))
+                left = np.repeat(np.arange(len(dishes)), sizes)
+                right = self.rng.choice(len(product_ids), len(left), p=weights)
+                left, right = unique_pairs(left, right, len(product_ids))
+                quantities = self.rng.integers(10, 500, len(left))
+                yield from zip(
+                    dishes[left].tolist(), product_ids[right].tolist(),
+                    quantities.tolist()
+                )
+
+        self._write(
+            DishProduct, ('dish_id', 'product_id', 'quantity'), rows()
+        )
+
+    def _create_dish_categories(self, dish_ids):
+        category_ids = np.fromiter(
+            Category.objects.values_list('pk', flat=True), dtype=np.int64
+        )
+        if not len(category_ids):
+            return
+        through = Dish.categories.through
+        left = np.repeat(np.arange(len(dish_ids)), 2)
+        right = self.rng.integers(0, len(category_ids), len(left))
+        left, right = unique_pairs(left, right, len(category_ids))
+        self._write(
+            through, ('dish_id', 'category_id'),
+            zip(dish_ids[left].tolist(), category_ids[right].tolist())
+        )
+
+    def _create_user_dish_pairs(self, model, count, user_ids, dish_ids):
+        """Закладки и план питания: популярные блюда встречаются чаще."""
+        users = self.rng.integers(0, len(user_ids), count)
+        dishes = self.rng.choice(
+            len(dish_ids), count,
+            p=zipf_weights(self.rng, len(dish_ids), self.zipf)
+        )
+        users, dishes = unique_pairs(users, dishes, len(dish_ids))
+        columns, defaults = model_columns(model)
+        positions = columns.index('user_id'), columns.index('dish_id')
+        # План питания равномерно распределён по дням недели.
+        day = columns.index('day') if model is MealPlan else None
+        days = self.rng.integers(0, len(MealPlan.DAYS_OF_WEEK), len(users))
+
+        def rows():
+            for index, (user_id, dish_id) in enumerate(zip(
+                user_ids[users].tolist(), dish_ids[dishes].tolist()
+            )):
+                row = list(defaults)
+                row[positions[0]] = user_id
+                row[positions[1]] = dish_id
+                if day is not None:
+                    row[day] = MealPlan.DAYS_OF_WEEK[days[index]][0]
+                yield row
+
+        self._write(model, columns, rows())
+
+    def _create_follows(self, count, user_ids):
+        """Граф подписок со степенным распределением числа подписчиков."""
+        followers = self.rng.integers(0, len(user_ids), count)
+        following = self.rng.choice(
+            len(user_ids), count,
+            p=zipf_weights(self.rng, len(user_ids), self.zipf)
+        )
+        keep = followers != following
+        followers, following = unique_pairs(
+            followers[keep], following[keep], len(user_ids)
+        )
+        columns, defaults = model_columns(ChefConnection)
+        positions = (
+            columns.index('follower_id'), columns.index('following_id')
+        )
+
+        def rows():
+            for follower_id, following_id in zip(
+                user_ids[followers].tolist(), user_ids[following].tolist()
+            ):
+                row = list(defaults)
+                row[positions[0]] = follower_id
+                row[positions[1]] = following_id
+                yield row
+
+        self._write(ChefConnection, columns, rows())
+
+    def _update_derived(self, dish_ids):
+        """Счётчики, списки покупок и поисковые документы новых строк."""
+        for model, field, source, foreign_key in COUNTERS:
+            reconcile_counter(
+                model, field, source, foreign_key, self.batch_size
+            )
+        rebuild_shopping_lists(batch_size=self.batch_size)
+        if connection.vendor == 'postgresql' and len(dish_ids):
+            Dish.objects.filter(
+                pk__gte=int(dish_ids[0]), pk__lte=int(dish_ids[-1])
+            ).update(search_vector=(
+                SearchVector(
+                    'title', weight='A', config=settings.SEARCH_CONFIG
+                )
+                + SearchVector(
+                    'description', weight='B', config=settings.SEARCH_CONFIG
+                )
+            ))
+        self.stdout.write('Counters, shopping lists and search vectors updated')
@@ -0,0 +1,156 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.models import Ingredient, Tag
+
+# Модель фикстуры -> (модель, поля уникальности, переименование полей).
+CATALOGUE = {
+    'recipes.ingredient': (
+        Ingredient,
+        ('name', 'measurement'),
+        {'measurement_unit': 'measurement'},
+    ),
+    'recipes.tag': (Tag, ('slug',), {}),
+}
+DEFAULT_MODEL = 'recipes.ingredient'
+
+
+def iter_json_array(file, chunk_size=64 * 1024):
+    """Потоково разбирает JSON-массив объектов, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = file.read(chunk_size)
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and position < len(buffer):
+                if buffer[position] != '[':
+                    raise CommandError('Expected a JSON array')
+                started = True
+                position += 1
+                continue
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield record
+        buffer = buffer[position:]
+        if not chunk:
+            if buffer.strip():
+                raise CommandError('Unexpected end of JSON input')
+            return
+
+
+def iter_records(path):
+    with open(path, encoding='utf-8') as file:
+        if path.suffix == '.csv':
+            yield from csv.DictReader(file)
+        elif path.suffix in ('.ndjson', '.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(file)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает каталог ингредиентов и тегов из фикстуры, CSV или '
+        'NDJSON пачками через bulk_create с обновлением при конфликте.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='prepared_base.json',
+            help='фикстура Django (.json), .csv или .ndjson/.jsonl'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'File not found: {path}')
+        self.batch_size = options['batch_size']
+        self.batches = {label: [] for label in CATALOGUE}
+        self.loaded = 0
+        self.started = time.monotonic()
+
+        skipped = 0
+        for record in iter_records(path):
+            label = record.get('model', DEFAULT_MODEL)
+            if label not in CATALOGUE:
+                skipped += 1
+                continue
+            self._add(label, record.get('fields', record))
+        for label in CATALOGUE:
+            self._flush(label)
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {self.loaded} rows, skipped {skipped} '
+            f'in {elapsed:.2f}s ({self.loaded / max(elapsed, 1e-6):.0f} '
+            'rows/s)'
+        ))
+
+    def _add(self, label, fields):
+        model, _, renames = CATALOGUE[label]
+        values = {}
+        for name, value in fields.items():
+            name = renames.get(name, name)
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.primary_key or field.is_relation:
+                continue
+            if value == '' and field.has_default():
+                continue
+            values[name] = field.to_python(value)
+        self.batches[label].append(values)
+        if len(self.batches[label]) >= self.batch_size:
+            self._flush(label)
+
+    def _flush(self, label):
+        rows = self.batches[label]
+        if not rows:
+            return
+        model, unique_fields, _ = CATALOGUE[label]
+        # Дубли внутри одной пачки ломают ON CONFLICT DO UPDATE.
+        unique_rows = {
+            tuple(row.get(field) for field in unique_fields): row
+            for row in rows
+        }
+        update_fields = sorted(
+            {name for row in unique_rows.values() for name in row}
+            - set(unique_fields)
+        )
+        objs = [model(**row) for row in unique_rows.values()]
+        with transaction.atomic():
+            if update_fields:
+                model.objects.bulk_create(
+                    objs,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields
+                )
+            else:
+                model.objects.bulk_create(objs, ignore_conflicts=True)
+        self.loaded += len(objs)
+        self.batches[label] = []
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'{label}: {self.loaded} rows '
+            f'({self.loaded / max(elapsed, 1e-6):.0f} rows/s)'
+        )
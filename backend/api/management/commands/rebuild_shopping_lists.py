@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import diff_shopping_lists, rebuild_shopping_lists
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает сводные списки покупок по плану питания '
+        'или сверяет их с фактической агрегацией (--verify).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='id пользователя, можно указать несколько раз'
+        )
+        parser.add_argument(
+            '--verify', action='store_true',
+            help='только сверить, ничего не изменяя'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        if options['verify']:
+            mismatches = diff_shopping_lists(user_ids)
+            for user_id, product_id, stored, live in mismatches:
+                self.stdout.write(
+                    f'user={user_id} product={product_id}: '
+                    f'stored {stored}, expected {live}'
+                )
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} mismatched rows')
+            self.stdout.write(self.style.SUCCESS('Shopping lists are in sync'))
+            return
+        created = rebuild_shopping_lists(user_ids, options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {created} shopping list rows')
+        )
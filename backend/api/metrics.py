@@ -0,0 +1,84 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram,
+    generate_latest, multiprocess
+)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Request processing time',
+    ('view', 'method', 'status'),
+    buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries',
+    'SQL queries per request',
+    ('view',),
+    buckets=QUERY_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Total SQL time per request',
+    ('view',),
+    buckets=LATENCY_BUCKETS
+)
+SERIALIZE_DURATION = Histogram(
+    'foodgram_serialize_duration_seconds',
+    'DRF serializer.data time without SQL',
+    ('view',),
+    buckets=LATENCY_BUCKETS
+)
+RENDER_DURATION = Histogram(
+    'foodgram_render_duration_seconds',
+    'DRF response rendering time',
+    ('view',),
+    buckets=LATENCY_BUCKETS
+)
+
+
+def observe(view, method, status, stats):
+    REQUEST_DURATION.labels(view, method, status).observe(stats.total)
+    DB_QUERIES.labels(view).observe(stats.queries)
+    DB_DURATION.labels(view).observe(stats.db_time)
+    SERIALIZE_DURATION.labels(view).observe(stats.serialize_time)
+    RENDER_DURATION.labels(view).observe(stats.render_time)
+
+
+def is_metrics_allowed(request):
+    """Доступ по токену (Authorization: Bearer) или по IP клиента."""
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, value = request.META.get(
+            'HTTP_AUTHORIZATION', ''
+        ).partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(
+            value.encode(), token.encode()
+        ):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """
+    Гистограммы в текстовом формате Prometheus. При заданном
+    PROMETHEUS_MULTIPROC_DIR данные собираются со всех воркеров gunicorn.
+    """
+    if not is_metrics_allowed(request):
+        return HttpResponseForbidden()
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
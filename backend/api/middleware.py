@@ -0,0 +1,107 @@
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import observe
+
+
+class RequestStats:
+    """Счётчики одного запроса: SQL, сериализация, рендеринг и общее время."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+
+    def finish(self):
+        self.total = perf_counter() - self.started
+
+    def server_timing(self):
+        app = max(
+            self.total - self.db_time - self.serialize_time - self.render_time,
+            0
+        )
+        return ', '.join((
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'app;dur={app * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+
+@contextmanager
+def count_queries(stats):
+    """Подключает stats ко всем соединениям с БД."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield
+
+
+def get_view_name(request, view_func):
+    """
+    Имя для метрик: ViewSet.action для DRF (например,
+    DishViewSet.list или DishViewSet.download_shopping_list),
+    иначе имя функции представления.
+    """
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{cls.__name__}.{action}'
+
+
+class RequestMetricsMiddleware:
+    """
+    Измеряет время запроса, число и время SQL-запросов по всем
+    подключениям, пишет гистограммы и заголовок Server-Timing.
+    Потоковые ответы измеряются до конца отдачи тела; заголовки
+    к этому моменту уже отправлены, поэтому Server-Timing у них нет.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.metrics = RequestStats()
+        with count_queries(stats):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self._stream(
+                response.streaming_content, request, response, stats
+            )
+            return response
+        self._finish(request, response, stats)
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = stats.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(request, view_func)
+
+    def _stream(self, content, request, response, stats):
+        try:
+            with count_queries(stats):
+                yield from content
+        finally:
+            self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        stats.finish()
+        view = getattr(request, 'metrics_view', 'unmatched')
+        observe(view, request.method, response.status_code, stats)
@@ -0,0 +1,144 @@
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, ExpressionWrapper, F, FloatField, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Lower, Trim
+from django.utils import timezone
+
+from recipes.models import Meal, MealIngredient
+
+NUTRIENTS = ('calories', 'protein', 'fat', 'carbs')
+
+# Граммов в единице измерения ингредиента. Для жидкостей плотность
+# принимается равной воде. Штуки, ложки и «по вкусу» в граммы не
+# переводятся: такие ингредиенты пропускаются, а КБЖУ помечается
+# неполным.
+UNIT_GRAMS = {
+    'г': 1, 'гр': 1, 'g': 1,
+    'кг': 1000, 'kg': 1000,
+    'мг': 0.001, 'mg': 0.001,
+    'мл': 1, 'ml': 1,
+    'л': 1000, 'l': 1000,
+}
+
+
+def unit_grams(measurement):
+    """Граммов в единице или None, если единица не весовая."""
+    return UNIT_GRAMS.get((measurement or '').strip().lower().rstrip('.'))
+
+
+def _cache_key(meal):
+    return f'nutrition:v2:{meal.pk}:{meal.updated.timestamp()}'
+
+
+def _as_dict(vector):
+    return {
+        nutrient: round(float(value), 1)
+        for nutrient, value in zip(NUTRIENTS, vector)
+    }
+
+
+def compute_nutrition(meals):
+    """
+    КБЖУ для набора блюд одним запросом и одной матричной операцией.
+    Значения ингредиентов хранятся на 100 г, количество переводится
+    в граммы по единице измерения (см. UNIT_GRAMS).
+    Возвращает {meal_id: {'total': {...}, 'per_serving': {...},
+    'complete': False, если часть ингредиентов не переведена в граммы}}.
+    """
+    meals = list(meals)
+    if not meals:
+        return {}
+    meal_index = {meal.pk: position for position, meal in enumerate(meals)}
+    rows = list(MealIngredient.objects.filter(
+        meal_id__in=meal_index
+    ).values_list(
+        'meal_id', 'ingredient__measurement', 'amount',
+        *(f'ingredient__{nutrient}' for nutrient in NUTRIENTS)
+    ))
+    totals = np.zeros((len(meals), len(NUTRIENTS)))
+    complete = np.ones(len(meals), dtype=bool)
+    if rows:
+        positions = np.fromiter(
+            (meal_index[row[0]] for row in rows), dtype=np.intp,
+            count=len(rows)
+        )
+        grams = np.array(
+            [unit_grams(row[1]) for row in rows], dtype=float
+        )
+        values = np.array([row[2:] for row in rows], dtype=float)
+        amounts, vectors = values[:, :1], values[:, 1:]
+        known = ~np.isnan(grams)
+        complete[positions[~known]] = False
+        np.add.at(
+            totals, positions[known],
+            vectors[known] * amounts[known] * grams[known, None] / 100
+        )
+    servings = np.array([meal.servings or 1 for meal in meals], dtype=float)
+    per_serving = totals / servings[:, None]
+    return {
+        meal.pk: {
+            'total': _as_dict(totals[position]),
+            'per_serving': _as_dict(per_serving[position]),
+            'complete': bool(complete[position]),
+        }
+        for position, meal in enumerate(meals)
+    }
+
+
+def get_nutrition(meals):
+    """compute_nutrition с кешем по id и времени изменения блюда."""
+    meals = list(meals)
+    keys = {meal.pk: _cache_key(meal) for meal in meals}
+    cached = cache.get_many(keys.values())
+    result = {
+        pk: cached[key] for pk, key in keys.items() if key in cached
+    }
+    computed = compute_nutrition(
+        meal for meal in meals if meal.pk not in result
+    )
+    cache.set_many(
+        {keys[pk]: value for pk, value in computed.items()},
+        settings.NUTRITION_CACHE_TIMEOUT
+    )
+    result.update(computed)
+    return result
+
+
+def annotate_calories(queryset):
+    """
+    Добавляет calories — калории на порцию, посчитанные в SQL, для
+    фильтров ?calories_max=. Единицы переводятся в граммы так же,
+    как в compute_nutrition.
+    """
+    units = defaultdict(list)
+    for unit, grams in UNIT_GRAMS.items():
+        units[grams] += [unit, f'{unit}.']
+    grams = Case(
+        *(When(unit__in=names, then=Value(float(value)))
+          for value, names in units.items()),
+        output_field=FloatField()
+    )
+    calories = ExpressionWrapper(
+        F('meal_ingredients__amount')
+        * F('meal_ingredients__ingredient__calories') * grams / 100,
+        output_field=FloatField()
+    )
+    return queryset.alias(
+        unit=Lower(Trim('meal_ingredients__ingredient__measurement'))
+    ).annotate(calories=ExpressionWrapper(
+        Coalesce(Sum(calories), 0.0) / F('servings'),
+        output_field=FloatField()
+    ))
+
+
+def refresh_meals(queryset, batch_size=500):
+    """Сдвигает updated пачками, сбрасывая кеш КБЖУ."""
+    pks = list(queryset.values_list('pk', flat=True).distinct())
+    for start in range(0, len(pks), batch_size):
+        batch = pks[start:start + batch_size]
+        Meal.objects.filter(pk__in=batch).update(updated=timezone.now())
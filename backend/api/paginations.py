@@ -1,6 +1,71 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def approximate_count(queryset):
+    """
+    Оценка числа строк из плана PostgreSQL без COUNT(*).
+    На других СУБД выполняется обычный count().
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
 
 
 class ApiPagination(PageNumberPagination):
     page_size_query_param = "limit"
     page_size = 6
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Keyset-пагинация без COUNT(*) и OFFSET.
+    Порядок берётся из cursor_ordering представления,
+    ?total=approx добавляет в ответ оценку общего числа записей.
+    """
+    page_size_query_param = "limit"
+    page_size = 6
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.request.query_params.get('total') == 'approx':
+            response.data['count'] = approximate_count(self.queryset)
+        return response
+
+
+class CursorPaginationMixin:
+    """Включает ApiCursorPagination параметром ?pagination=cursor."""
+    cursor_pagination_class = ApiCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            query_params = self.request.query_params
+            if (
+                query_params.get('pagination') == 'cursor'
+                or 'cursor' in query_params
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
@@ -0,0 +1,177 @@
+import threading
+from collections import defaultdict
+from uuid import uuid4
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from recipes.models import DishProduct
+
+GENERATION_CACHE_KEY = 'pantry_index:generation'
+SEQUENCE_CACHE_KEY = 'pantry_index:sequence'
+CHANGE_TIMEOUT = 24 * 60 * 60
+
+
+def change_cache_key(sequence):
+    return f'pantry_index:change:{sequence}'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        generation = bump_generation()
+    return generation
+
+
+def bump_generation():
+    """Сбрасывает индекс во всех процессах (полная перестройка)."""
+    generation = uuid4().hex
+    cache.set(GENERATION_CACHE_KEY, generation, None)
+    return generation
+
+
+def get_sequence():
+    return cache.get(SEQUENCE_CACHE_KEY, 0)
+
+
+def record_change(dish_id):
+    """Записывает в журнал блюдо, состав которого изменился."""
+    cache.add(SEQUENCE_CACHE_KEY, 0, None)
+    sequence = cache.incr(SEQUENCE_CACHE_KEY)
+    cache.set(change_cache_key(sequence), dish_id, CHANGE_TIMEOUT)
+
+
+def _as_array(ids):
+    return np.array(sorted(ids), dtype=np.int64)
+
+
+class PantryIndex:
+    """
+    Инвертированный индекс продукт -> отсортированный массив id блюд.
+    Строится лениво в памяти процесса. Изменения состава блюд
+    догоняются по журналу в кеше; если журнал длиннее
+    PANTRY_INDEX_MAX_PATCH или в нём есть пропуски, индекс
+    перестраивается целиком. Читатели работают без блокировки
+    с неизменяемым снимком (списки, id блюд, размеры составов),
+    который публикуется одним присваиванием.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._sequence = 0
+        self._dish_products = {}
+        self._snapshot = ({}, _as_array(()), _as_array(()))
+
+    def _refresh(self):
+        generation, sequence = get_generation(), get_sequence()
+        if generation == self._generation and sequence == self._sequence:
+            return
+        with self._lock:
+            if generation != self._generation or not self._patch(sequence):
+                self._rebuild(sequence)
+            self._generation = generation
+
+    def _rebuild(self, sequence):
+        dish_products = defaultdict(set)
+        for dish_id, product_id in DishProduct.objects.values_list(
+            'dish_id', 'product_id'
+        ).order_by().iterator(chunk_size=10000):
+            dish_products[dish_id].add(product_id)
+        postings = defaultdict(set)
+        for dish_id, product_ids in dish_products.items():
+            for product_id in product_ids:
+                postings[product_id].add(dish_id)
+        self._dish_products = dict(dish_products)
+        self._publish({
+            product_id: _as_array(dish_ids)
+            for product_id, dish_ids in postings.items()
+        })
+        self._sequence = sequence
+
+    def _patch(self, sequence):
+        """Применяет журнал изменений, False — если нужна перестройка."""
+        if sequence == self._sequence:
+            return True
+        if not 0 < sequence - self._sequence <= settings.PANTRY_INDEX_MAX_PATCH:
+            return False
+        keys = [
+            change_cache_key(number)
+            for number in range(self._sequence + 1, sequence + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+        dish_ids = set(changes.values())
+        fresh = defaultdict(set)
+        for dish_id, product_id in DishProduct.objects.filter(
+            dish_id__in=dish_ids
+        ).values_list('dish_id', 'product_id'):
+            fresh[dish_id].add(product_id)
+        touched = defaultdict(lambda: (set(), set()))
+        for dish_id in dish_ids:
+            old = self._dish_products.pop(dish_id, set())
+            new = fresh.get(dish_id, set())
+            if new:
+                self._dish_products[dish_id] = new
+            for product_id in old - new:
+                touched[product_id][0].add(dish_id)
+            for product_id in new - old:
+                touched[product_id][1].add(dish_id)
+        # Правки идут в копию словаря: опубликованный снимок не меняется.
+        postings = dict(self._snapshot[0])
+        for product_id, (removed, added) in touched.items():
+            merged = np.union1d(
+                np.setdiff1d(
+                    postings.get(product_id, _as_array(())),
+                    _as_array(removed)
+                ),
+                _as_array(added)
+            )
+            if len(merged):
+                postings[product_id] = merged
+            else:
+                postings.pop(product_id, None)
+        self._publish(postings)
+        self._sequence = sequence
+        return True
+
+    def _publish(self, postings):
+        dish_ids = _as_array(self._dish_products)
+        dish_sizes = np.fromiter(
+            (len(self._dish_products[pk]) for pk in dish_ids.tolist()),
+            dtype=np.int64, count=len(dish_ids)
+        )
+        self._snapshot = (postings, dish_ids, dish_sizes)
+
+    def match(self, product_ids, limit, max_missing=None):
+        """
+        Блюда, в которых есть хотя бы один из продуктов, по убыванию
+        доли покрытия состава и возрастанию числа недостающих продуктов.
+        Возвращает [(dish_id, совпало, не хватает, покрытие)].
+        """
+        self._refresh()
+        index, all_dish_ids, all_sizes = self._snapshot
+        postings = [index[pk] for pk in set(product_ids) if pk in index]
+        if not postings:
+            return []
+        dish_ids, matched = np.unique(
+            np.concatenate(postings), return_counts=True
+        )
+        sizes = all_sizes[np.searchsorted(all_dish_ids, dish_ids)]
+        missing = sizes - matched
+        coverage = matched / sizes
+        if max_missing is not None:
+            keep = missing <= max_missing
+            dish_ids, matched = dish_ids[keep], matched[keep]
+            missing, coverage = missing[keep], coverage[keep]
+        order = np.lexsort((-matched, missing, -coverage))[:limit]
+        return [
+            (int(dish_ids[i]), int(matched[i]), int(missing[i]),
+             round(float(coverage[i]), 3))
+            for i in order
+        ]
+
+
+pantry_index = PantryIndex()
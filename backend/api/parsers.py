@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import MultiPartParser
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded image is too large.'
+    default_code = 'upload_too_large'
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет файл на диск и обрывает загрузку, как только он превысил лимит."""
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise UploadTooLarge()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class ImageMultiPartParser(MultiPartParser):
+    """
+    multipart/form-data для картинок: тело больше лимита отклоняется
+    по Content-Length до чтения, файлы потоково пишутся во временные.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length > (
+            settings.IMAGE_UPLOAD_MAX_SIZE
+            + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        ):
+            raise UploadTooLarge()
+        request.upload_handlers = [
+            LimitedTemporaryFileUploadHandler(request._request)
+        ]
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,82 @@
+import threading
+import unicodedata
+from bisect import bisect_left
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from recipes.models import Product
+
+VERSION_CACHE_KEY = 'product_index:version'
+
+
+def normalize(value):
+    """Ключ поиска: регистр и 'ё' не различаются."""
+    return unicodedata.normalize('NFC', value).casefold().replace('ё', 'е')
+
+
+def get_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = bump_version()
+    return version
+
+
+def bump_version():
+    version = uuid4().hex
+    cache.set(VERSION_CACHE_KEY, version, None)
+    return version
+
+
+class ProductPrefixIndex:
+    """
+    Отсортированный по нормализованному названию список продуктов.
+    Строится лениво в памяти процесса и перестраивается,
+    когда в кеше меняется версия каталога. Ключи и продукты
+    публикуются одним присваиванием кортежа, поэтому читатель
+    без блокировки всегда видит согласованную пару.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = ((), ())
+
+    def _refresh(self):
+        version = get_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            entries = sorted(
+                (normalize(name), pk, name, unit)
+                for pk, name, unit in Product.objects.values_list(
+                    'id', 'name', 'unit'
+                ).iterator()
+            )
+            self._snapshot = (
+                tuple(key for key, *_ in entries),
+                tuple(
+                    Product(id=pk, name=name, unit=unit)
+                    for _, pk, name, unit in entries
+                )
+            )
+            self._version = version
+
+    def search(self, prefix, limit):
+        self._refresh()
+        keys, products = self._snapshot
+        prefix = normalize(prefix)
+        start = bisect_left(keys, prefix)
+        result = []
+        for key, product in zip(
+            keys[start:start + limit], products[start:start + limit]
+        ):
+            if not key.startswith(prefix):
+                break
+            result.append(product)
+        return result
+
+
+product_index = ProductPrefixIndex()
@@ -0,0 +1,184 @@
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min, Subquery
+from scipy import sparse
+
+from recipes.models import Bookmark, Dish, DishSimilarity
+
+# Ключ advisory-блокировки PostgreSQL: полный пересчёт берёт её
+# исключительно, точечное обновление — разделяемо.
+SIMILARITY_LOCK_ID = 0x5D15
+
+
+class RebuildInProgress(Exception):
+    """Идёт полный пересчёт: точечное обновление нужно повторить позже."""
+
+
+def _advisory_lock(function):
+    """
+    Вызывает pg_*advisory* с ключом SIMILARITY_LOCK_ID. На других СУБД
+    записи и так выполняются по одной, блокировка считается взятой.
+    """
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {function}(%s)', [SIMILARITY_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def interaction_matrix():
+    """
+    Разреженная бинарная матрица пользователь × блюдо по закладкам.
+    Возвращает (матрица CSR, массив id блюд по столбцам).
+    """
+    pairs = np.fromiter(
+        (
+            value
+            for pair in Bookmark.objects.values_list(
+                'user_id', 'dish_id'
+            ).order_by().iterator(chunk_size=10000)
+            for value in pair
+        ),
+        dtype=np.int64
+    ).reshape(-1, 2)
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    dish_ids, columns = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (rows, columns)),
+        shape=(len(user_ids), len(dish_ids))
+    )
+    return matrix, dish_ids
+
+
+def top_k_neighbours(matrix, k, batch_size=1024):
+    """
+    Косинусные соседи столбцов матрицы пачками строк item × item.
+    Для каждой пачки отдаёт список (индекс, индекс соседа, мера).
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0))).ravel()
+    norms[norms == 0] = 1
+    normalized = sparse.csr_matrix(matrix.multiply(1 / norms))
+    items = normalized.T.tocsr()
+    for start in range(0, items.shape[0], batch_size):
+        similarities = (items[start:start + batch_size] @ normalized).tocsr()
+        similarities.setdiag(0, k=start)
+        similarities.eliminate_zeros()
+        neighbours = []
+        for row in range(similarities.shape[0]):
+            begin, end = similarities.indptr[row:row + 2]
+            columns = similarities.indices[begin:end]
+            scores = similarities.data[begin:end]
+            if len(scores) > k:
+                best = np.argpartition(-scores, k)[:k]
+                columns, scores = columns[best], scores[best]
+            neighbours.extend(
+                (start + row, column, score)
+                for column, score in zip(columns, scores)
+            )
+        yield neighbours
+
+
+def current_generation():
+    """Опубликованное поколение соседей — наименьшее в таблице."""
+    return Subquery(
+        DishSimilarity.objects.order_by('generation').values(
+            'generation'
+        )[:1]
+    )
+
+
+def _published_generation():
+    return DishSimilarity.objects.aggregate(
+        generation=Min('generation')
+    )['generation']
+
+
+def rebuild_similarities(k=None, batch_size=1024):
+    """
+    Полный пересчёт DishSimilarity, возвращает число записанных пар.
+    Соседи пишутся новым поколением по пачкам исходных блюд, читатели
+    до конца видят прежнее; переключение — одно удаление старых строк.
+    Точечные обновления на это время откладываются блокировкой, иначе
+    они попали бы в поколение, которое удалит переключение.
+    """
+    k = k or settings.RECOMMENDATIONS_TOP_K
+    _advisory_lock('pg_advisory_lock')
+    try:
+        return _rebuild_similarities(k, batch_size)
+    finally:
+        _advisory_lock('pg_advisory_unlock')
+
+
+def _rebuild_similarities(k, batch_size):
+    matrix, dish_ids = interaction_matrix()
+    published = _published_generation()
+    if published is None:
+        generation = 0
+    else:
+        # Остатки прерванного пересчёта.
+        DishSimilarity.objects.filter(generation__gt=published).delete()
+        generation = published + 1
+    written = 0
+    for neighbours in top_k_neighbours(matrix, k, batch_size):
+        DishSimilarity.objects.bulk_create(
+            [
+                DishSimilarity(
+                    dish_id=dish_ids[row], similar_id=dish_ids[column],
+                    score=float(score), generation=generation
+                )
+                for row, column, score in neighbours
+            ],
+            batch_size=1000
+        )
+        written += len(neighbours)
+    DishSimilarity.objects.filter(generation__lt=generation).delete()
+    return written
+
+
+def refresh_dish_similarities(dish_id, k=None):
+    """
+    Точечное обновление соседей одного блюда после новой закладки.
+    Совместные закладки считаются одним запросом, нормы берутся
+    из денормализованного Dish.bookmarks_count. Во время полного
+    пересчёта бросает RebuildInProgress.
+    """
+    k = k or settings.RECOMMENDATIONS_TOP_K
+    dish = Dish.objects.filter(pk=dish_id).only('bookmarks_count').first()
+    if dish is None:
+        return
+    rows = list(
+        Bookmark.objects.filter(
+            user__bookmarks__dish_id=dish_id
+        ).exclude(dish_id=dish_id).values_list(
+            'dish_id', 'dish__bookmarks_count'
+        ).annotate(together=Count('pk')).order_by()
+    )
+    if not rows:
+        return
+    values = np.array(rows, dtype=np.float64)
+    counts = np.maximum(values[:, 1] * max(dish.bookmarks_count, 1), 1)
+    scores = values[:, 2] / np.sqrt(counts)
+    best = np.argsort(-scores)[:k]
+    scores_by_dish = dict(zip(values[:, 0].astype(int), scores))
+    with transaction.atomic():
+        if not _advisory_lock('pg_try_advisory_xact_lock_shared'):
+            raise RebuildInProgress
+        generation = _published_generation() or 0
+        reverse = list(DishSimilarity.objects.filter(
+            dish_id__in=scores_by_dish, similar_id=dish_id,
+            generation=generation
+        ))
+        for obj in reverse:
+            obj.score = float(scores_by_dish[obj.dish_id])
+        DishSimilarity.objects.filter(
+            dish_id=dish_id, generation=generation
+        ).delete()
+        DishSimilarity.objects.bulk_create([
+            DishSimilarity(
+                dish_id=dish_id, similar_id=int(values[index, 0]),
+                score=float(scores[index]), generation=generation
+            )
+            for index in best
+        ])
+        DishSimilarity.objects.bulk_update(reverse, ['score'])
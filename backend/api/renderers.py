@@ -0,0 +1,53 @@
+from time import perf_counter
+
+from rest_framework.renderers import JSONRenderer
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer, добавляющий время сериализации в метрики запроса."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            request = (renderer_context or {}).get('request')
+            stats = getattr(request, 'metrics', None)
+            if stats is not None:
+                stats.render_time += perf_counter() - started
+
+
+class TimedSerializer:
+    """
+    Обёртка сериализатора: время serializer.data без SQL-запросов
+    (их учитывает RequestStats) записывается в метрики запроса.
+    """
+
+    def __init__(self, serializer, stats):
+        self._serializer = serializer
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._serializer, name)
+
+    @property
+    def data(self):
+        db_time = self._stats.db_time
+        started = perf_counter()
+        try:
+            return self._serializer.data
+        finally:
+            self._stats.serialize_time += (
+                perf_counter() - started - (self._stats.db_time - db_time)
+            )
+
+
+class SerializationTimingMixin:
+    """Измеряет serializer.data для сериализаторов из get_serializer()."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        stats = getattr(self.request, 'metrics', None)
+        if stats is None:
+            return serializer
+        return TimedSerializer(serializer, stats)
@@ -1,13 +1,20 @@
 from django.contrib.auth import get_user_model
 from djoser.serializers import UserCreateSerializer, UserSerializer
+from django.db import transaction
 from rest_framework import serializers
 
 from recipes.models import (Recipe, Ingredient,
                             Tag, ShoppingCart,
                             Favorite, RecipeIngredient, Category,
                             Product, Dish, DishProduct, Bookmark,
-                            MealPlan)
-from users.models import Subscription, Follow
+                            MealPlan, Meal, MealIngredient)
+from .fields import (
+    ImageRenditionsField, ImageUploadField, PrimaryKeyListField
+)
+from .nutrition import get_nutrition
+from .services import sync_related_rows, update_dish_in_shopping_lists
+from .social import get_social_graph
+from .validators import format_ids, missing_ids
 
 User = get_user_model()
 
@@ -33,16 +40,12 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Subscription.objects.filter(user=user, author=obj).exists()
+        request = self.context.get('request')
+        return get_social_graph(request).is_subscribed(obj)
 
     def get_is_following(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Follow.objects.filter(follower=user, following=obj).exists()
+        request = self.context.get('request')
+        return get_social_graph(request).is_following(obj)
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -90,12 +93,16 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return Favorite.objects.filter(user=user, recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
@@ -113,10 +120,8 @@ class RecipeIngredientCreateSerializer(serializers.ModelSerializer):
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
     ingredients = RecipeIngredientCreateSerializer(many=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True
-    )
-    image = serializers.Base64ImageField()
+    tags = PrimaryKeyListField(queryset=Tag.objects.all())
+    image = ImageUploadField()
 
     class Meta:
         model = Recipe
@@ -133,11 +138,16 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         self._create_ingredients(recipe, ingredients_data)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if 'ingredients' in validated_data:
-            ingredients_data = validated_data.pop('ingredients')
-            instance.ingredients.clear()
-            self._create_ingredients(instance, ingredients_data)
+            sync_related_rows(
+                instance.recipe_ingredients, 'ingredient_id', 'amount',
+                {
+                    item['id']: item['amount']
+                    for item in validated_data.pop('ingredients')
+                }
+            )
         if 'tags' in validated_data:
             instance.tags.set(validated_data.pop('tags'))
         return super().update(instance, validated_data)
@@ -163,6 +173,12 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Duplicate ingredients are not allowed'
             )
+        missing = missing_ids(Ingredient.objects.all(), ingredient_ids)
+        if missing:
+            raise serializers.ValidationError({
+                'ingredients': f'Ingredients do not exist: '
+                               f'{format_ids(missing)}.'
+            })
         return data
 
 
@@ -313,22 +329,27 @@ class DishReadSerializer(serializers.ModelSerializer):
     is_bookmarked = serializers.SerializerMethodField()
     is_in_meal_plan = serializers.SerializerMethodField()
     image = serializers.Base64ImageField()
+    image_renditions = ImageRenditionsField()
 
     class Meta:
         model = Dish
         fields = (
             'id', 'categories', 'creator', 'products',
             'is_bookmarked', 'is_in_meal_plan',
-            'title', 'image', 'description', 'prep_time'
+            'title', 'image', 'image_renditions', 'description', 'prep_time'
         )
 
     def get_is_bookmarked(self, obj):
+        if hasattr(obj, 'is_bookmarked'):
+            return obj.is_bookmarked
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
         return Bookmark.objects.filter(user=user, dish=obj).exists()
 
     def get_is_in_meal_plan(self, obj):
+        if hasattr(obj, 'is_in_meal_plan'):
+            return obj.is_in_meal_plan
         user = self.context.get('request').user
         if user.is_anonymous:
             return False
@@ -346,10 +367,10 @@ class DishProductCreateSerializer(serializers.ModelSerializer):
 
 class DishCreateSerializer(serializers.ModelSerializer):
     products = DishProductCreateSerializer(many=True)
-    categories = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(), many=True
+    categories = PrimaryKeyListField(
+        queryset=Category.objects.all(), cache_namespace='categories'
     )
-    image = serializers.Base64ImageField()
+    image = ImageUploadField()
 
     class Meta:
         model = Dish
@@ -358,6 +379,7 @@ class DishCreateSerializer(serializers.ModelSerializer):
             'title', 'description', 'prep_time'
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         products_data = validated_data.pop('products')
         categories_data = validated_data.pop('categories')
@@ -366,11 +388,20 @@ class DishCreateSerializer(serializers.ModelSerializer):
         self._create_products(dish, products_data)
         return dish
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if 'products' in validated_data:
-            products_data = validated_data.pop('products')
-            instance.products.clear()
-            self._create_products(instance, products_data)
+            new_quantities = {
+                item['id']: item['quantity']
+                for item in validated_data.pop('products')
+            }
+            old_quantities = sync_related_rows(
+                instance.dish_products, 'product_id', 'quantity',
+                new_quantities
+            )
+            update_dish_in_shopping_lists(
+                instance, old_quantities, new_quantities
+            )
         if 'categories' in validated_data:
             instance.categories.set(validated_data.pop('categories'))
         return super().update(instance, validated_data)
@@ -396,13 +427,31 @@ class DishCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Duplicate products are not allowed'
             )
+        missing = missing_ids(Product.objects.all(), product_ids)
+        if missing:
+            raise serializers.ValidationError({
+                'products': f'Products do not exist: {format_ids(missing)}.'
+            })
         return data
 
 
 class DishShortSerializer(serializers.ModelSerializer):
+    image_renditions = ImageRenditionsField()
+
     class Meta:
         model = Dish
-        fields = ('id', 'title', 'image', 'prep_time')
+        fields = ('id', 'title', 'image', 'image_renditions', 'prep_time')
+
+
+class DishPantryMatchSerializer(DishShortSerializer):
+    matched_count = serializers.IntegerField(read_only=True)
+    missing_count = serializers.IntegerField(read_only=True)
+    coverage = serializers.FloatField(read_only=True)
+
+    class Meta(DishShortSerializer.Meta):
+        fields = DishShortSerializer.Meta.fields + (
+            'matched_count', 'missing_count', 'coverage'
+        )
 
 
 class UserFollowSerializer(CustomUserSerializer):
@@ -418,12 +467,63 @@ class UserFollowSerializer(CustomUserSerializer):
         )
 
     def get_dishes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('dishes_limit')
-        dishes = obj.dishes.all()
-        if limit:
-            dishes = dishes[:int(limit)]
-        return DishShortSerializer(dishes, many=True).data
+        dishes = getattr(obj, 'recent_dishes', None)
+        if dishes is None:
+            request = self.context.get('request')
+            limit = request.GET.get('dishes_limit')
+            dishes = obj.dishes.all()
+            if limit:
+                dishes = dishes[:int(limit)]
+        return DishShortSerializer(
+            dishes, many=True, context=self.context
+        ).data
 
     def get_dishes_count(self, obj):
-        return obj.dishes.count()
+        return obj.recipes_count
+
+
+class MealIngredientSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement = serializers.ReadOnlyField(source='ingredient.measurement')
+
+    class Meta:
+        model = MealIngredient
+        fields = ('id', 'name', 'measurement', 'amount')
+
+
+class MealReadSerializer(serializers.ModelSerializer):
+    chef = CustomUserSerializer(read_only=True)
+    ingredients = MealIngredientSerializer(
+        source='meal_ingredients',
+        many=True,
+        read_only=True
+    )
+    nutrition = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Meal
+        fields = (
+            'id', 'chef', 'ingredients', 'title', 'image', 'description',
+            'cooking_time', 'servings', 'difficulty',
+            'nutrition', 'created'
+        )
+
+    def get_nutrition(self, obj):
+        """Итоги страницы считаются во view одним пакетом."""
+        nutrition = self.context.get('nutrition', {})
+        if obj.pk not in nutrition:
+            nutrition = get_nutrition([obj])
+        return nutrition[obj.pk]
+
+
+class MealPlanIngredientSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    measurement = serializers.CharField()
+    amount = serializers.IntegerField()
+
+
+class MealPlanDaySerializer(serializers.Serializer):
+    day = serializers.CharField()
+    dishes = DishShortSerializer(many=True)
+    ingredients = MealPlanIngredientSerializer(many=True)
@@ -1,28 +1,261 @@
-from django.db.models import Sum
+from collections import defaultdict
 from datetime import date
-from django.http import HttpResponse
+from itertools import islice
 
-from recipes.models import IngredientRecipe
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from recipes.models import (
+    DishProduct, IngredientRecipe, MealPlan, ShoppingListItem
+)
+from .utils import generate_shopping_list
 
 
 def shopping_cart(self, request, author):
     """Скачивание списка продуктов для выбранных рецептов пользователя."""
     sum_ingredients_in_recipes = IngredientRecipe.objects.filter(
         recipe__shopping_cart__author=author
-    ).values(
+    ).values_list(
         'ingredient__name', 'ingredient__measurement_unit'
     ).annotate(
         amounts=Sum('amount', distinct=True)).order_by('amounts')
     today = date.today().strftime("%d-%m-%Y")
-    shopping_list = f'Список покупок на: {today}\n\n'
-    for ingredient in sum_ingredients_in_recipes:
-        shopping_list += (
-            f'{ingredient["ingredient__name"]} - '
-            f'{ingredient["amounts"]} '
-            f'{ingredient["ingredient__measurement_unit"]}\n'
+    return generate_shopping_list(
+        sum_ingredients_in_recipes.iterator(),
+        title=f'Список покупок на: {today}\n',
+        footer='\nFoodgram (2022)'
+    )
+
+
+def _upsert_shopping_list_items(deltas, batch_size=1000):
+    """
+    Прибавляет положительные delta одним INSERT ... ON CONFLICT на пачку:
+    параллельные вставки той же строки складываются, а не падают
+    с IntegrityError.
+    """
+    table = ShoppingListItem._meta.db_table
+    rows = iter(deltas.items())
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, product_id, amount) VALUES '
+                + ', '.join(['(%s, %s, %s)'] * len(batch))
+                + ' ON CONFLICT (user_id, product_id) DO UPDATE '
+                f'SET amount = {table}.amount + EXCLUDED.amount',
+                [
+                    value
+                    for (user_id, product_id), delta in batch
+                    for value in (user_id, product_id, delta)
+                ]
+            )
+
+
+def _apply_shopping_list_deltas(deltas):
+    """
+    Применяет изменения {(user_id, product_id): delta} к ShoppingListItem.
+    Прибавления пишутся upsert-ом, уменьшаемые строки блокируются
+    на время транзакции, нулевые остатки удаляются.
+    """
+    added = {key: delta for key, delta in deltas.items() if delta > 0}
+    removed = {key: delta for key, delta in deltas.items() if delta < 0}
+    with transaction.atomic():
+        _upsert_shopping_list_items(added)
+        if not removed:
+            return
+        to_update, to_delete = [], []
+        for item in ShoppingListItem.objects.select_for_update().filter(
+            user_id__in={user_id for user_id, _ in removed},
+            product_id__in={product_id for _, product_id in removed}
+        ):
+            delta = removed.get((item.user_id, item.product_id))
+            if delta is None:
+                continue
+            item.amount += delta
+            if item.amount > 0:
+                to_update.append(item)
+            else:
+                to_delete.append(item.pk)
+        ShoppingListItem.objects.bulk_update(to_update, ['amount'])
+        ShoppingListItem.objects.filter(pk__in=to_delete).delete()
+
+
+def sync_related_rows(manager, key, value, new_values):
+    """
+    Приводит строки обратной связи (например, dish.dish_products)
+    к {key: value}: не больше одного удаления, одного bulk_create
+    и одного bulk_update, неизменённые строки не трогаются.
+    Возвращает прежние значения {key: value}.
+    """
+    existing = {getattr(row, key): row for row in manager.all()}
+    old_values = {
+        row_key: getattr(row, value) for row_key, row in existing.items()
+    }
+    to_delete = [
+        row.pk for row_key, row in existing.items()
+        if row_key not in new_values
+    ]
+    to_create = []
+    to_update = []
+    for row_key, row_value in new_values.items():
+        row = existing.get(row_key)
+        if row is None:
+            to_create.append(manager.model(**{
+                manager.field.name: manager.instance,
+                key: row_key,
+                value: row_value,
+            }))
+        elif getattr(row, value) != row_value:
+            setattr(row, value, row_value)
+            to_update.append(row)
+    if to_delete:
+        manager.filter(pk__in=to_delete).delete()
+    if to_create:
+        manager.model.objects.bulk_create(to_create)
+    if to_update:
+        manager.model.objects.bulk_update(to_update, [value])
+    return old_values
+
+
+def _dish_quantities(dish):
+    return dict(dish.dish_products.values_list('product_id', 'quantity'))
+
+
+def add_dish_to_shopping_list(user, dish):
+    _apply_shopping_list_deltas({
+        (user.pk, product_id): quantity
+        for product_id, quantity in _dish_quantities(dish).items()
+    })
+
+
+def remove_dish_from_shopping_list(user, dish):
+    _apply_shopping_list_deltas({
+        (user.pk, product_id): -quantity
+        for product_id, quantity in _dish_quantities(dish).items()
+    })
+
+
+def update_dish_in_shopping_lists(dish, old_quantities, new_quantities):
+    """Переносит изменение состава блюда в списки всех, кто его запланировал."""
+    product_deltas = {
+        product_id: (
+            new_quantities.get(product_id, 0)
+            - old_quantities.get(product_id, 0)
         )
-    shopping_list += '\n\nFoodgram (2022)'
-    filename = 'shopping_list.txt'
-    response = HttpResponse(shopping_list, content_type='text/plain')
-    response['Content-Disposition'] = f'attachment; filename={filename}'
-    return response
+        for product_id in old_quantities.keys() | new_quantities.keys()
+    }
+    plans = MealPlan.objects.filter(dish=dish).values(
+        'user_id'
+    ).annotate(count=Count('id')).order_by()
+    _apply_shopping_list_deltas({
+        (plan['user_id'], product_id): delta * plan['count']
+        for plan in plans
+        for product_id, delta in product_deltas.items()
+    })
+
+
+def remove_dish_from_shopping_lists(dish):
+    update_dish_in_shopping_lists(dish, _dish_quantities(dish), {})
+
+
+def live_shopping_list_totals(user_ids=None):
+    """Суммы (user_id, product_id, amount), посчитанные по плану питания."""
+    queryset = DishProduct.objects.filter(dish__meal_plans__isnull=False)
+    if user_ids is not None:
+        queryset = queryset.filter(dish__meal_plans__user_id__in=user_ids)
+    return queryset.values_list(
+        'dish__meal_plans__user_id', 'product_id'
+    ).annotate(amount=Sum('quantity')).order_by()
+
+
+def rebuild_shopping_lists(user_ids=None, batch_size=1000):
+    """Пересобирает ShoppingListItem по плану питания, возвращает число строк."""
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    totals = live_shopping_list_totals(user_ids).iterator(
+        chunk_size=batch_size
+    )
+    created = 0
+    with transaction.atomic():
+        items.delete()
+        while True:
+            batch = [
+                ShoppingListItem(
+                    user_id=user_id, product_id=product_id, amount=amount
+                )
+                for user_id, product_id, amount in islice(totals, batch_size)
+            ]
+            if not batch:
+                return created
+            ShoppingListItem.objects.bulk_create(batch)
+            created += len(batch)
+
+
+def diff_shopping_lists(user_ids=None):
+    """Расхождения (user_id, product_id, сохранено, фактически)."""
+    stored = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+    stored = {
+        (user_id, product_id): amount
+        for user_id, product_id, amount in stored.values_list(
+            'user_id', 'product_id', 'amount'
+        ).iterator()
+    }
+    mismatches = []
+    for user_id, product_id, amount in live_shopping_list_totals(
+        user_ids
+    ).iterator():
+        stored_amount = stored.pop((user_id, product_id), 0)
+        if stored_amount != amount:
+            mismatches.append((user_id, product_id, stored_amount, amount))
+    mismatches.extend(
+        (user_id, product_id, amount, 0)
+        for (user_id, product_id), amount in stored.items()
+    )
+    return mismatches
+
+
+def meal_plan_week(user, days):
+    """
+    Сетка плана питания по дням: блюда и суммы продуктов.
+    Суммы считаются одним запросом с группировкой по (день, продукт),
+    блюда загружаются вторым запросом.
+    """
+    week = {
+        day: {'day': day, 'dishes': [], 'ingredients': []}
+        for day in days
+    }
+    plans = MealPlan.objects.filter(user=user, day__in=days)
+    for plan in plans.select_related('dish').order_by('pk'):
+        week[plan.day]['dishes'].append(plan.dish)
+    prefix = 'dish__dish_products__'
+    totals = plans.filter(**{f'{prefix}isnull': False}).values(
+        'day', f'{prefix}product__name', f'{prefix}product__unit'
+    ).annotate(
+        amount=Sum(f'{prefix}quantity')
+    ).order_by('day', f'{prefix}product__name')
+    for row in totals:
+        week[row['day']]['ingredients'].append({
+            'name': row[f'{prefix}product__name'],
+            'measurement': row[f'{prefix}product__unit'],
+            'amount': row['amount'],
+        })
+    return list(week.values())
+
+
+def meal_plan_shopping_list(week):
+    """Строки (название, единица, количество) для выбранных дней плана."""
+    amounts = defaultdict(int)
+    for day in week:
+        for ingredient in day['ingredients']:
+            amounts[
+                ingredient['name'], ingredient['measurement']
+            ] += ingredient['amount']
+    return [
+        (name, measurement, amount)
+        for (name, measurement), amount in sorted(amounts.items())
+    ]
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.models import (
+    Bookmark, Category, Dish, DishProduct, Ingredient, Meal, MealIngredient,
+    Product
+)
+from users.models import ChefConnection
+from .cache import bump_generation
+from .images import RENDITION_FIELDS
+from .nutrition import refresh_meals
+from .pantry_index import (
+    bump_generation as bump_pantry_generation, record_change
+)
+from .product_index import bump_version
+from .tasks import (
+    fan_out_dish, follow_timeline, generate_image_renditions,
+    unfollow_timeline, update_dish_similarities
+)
+
+User = get_user_model()
+
+CACHE_NAMESPACES = {
+    Dish: ('dishes',),
+    DishProduct: ('dishes',),
+    Dish.categories.through: ('dishes',),
+    User: ('dishes',),
+    Category: ('dishes', 'categories'),
+    Product: ('dishes', 'products'),
+}
+
+
+@receiver((post_save, post_delete), sender=Product)
+def invalidate_product_index(sender, **kwargs):
+    bump_version()
+
+
+def invalidate_response_cache(sender, update_fields=None, **kwargs):
+    if sender is User and update_fields and set(update_fields) <= {
+        'last_login'
+    }:
+        return
+    for namespace in CACHE_NAMESPACES[sender]:
+        transaction.on_commit(lambda ns=namespace: bump_generation(ns))
+
+
+for model in CACHE_NAMESPACES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+for through in (Dish.categories.through, DishProduct):
+    m2m_changed.connect(invalidate_response_cache, sender=through)
+
+
+def schedule_image_renditions(sender, instance, **kwargs):
+    label = sender._meta.label
+    source_field, target_field = RENDITION_FIELDS[label]
+    image = getattr(instance, source_field)
+    if image and getattr(instance, target_field).get('source') != image.name:
+        transaction.on_commit(
+            lambda: generate_image_renditions.delay(label, instance.pk)
+        )
+
+
+for model in (Dish, User):
+    post_save.connect(schedule_image_renditions, sender=model)
+
+
+@receiver((post_save, post_delete), sender=MealIngredient)
+def refresh_meal_nutrition(sender, instance, **kwargs):
+    meals = Meal.objects.filter(pk=instance.meal_id)
+    transaction.on_commit(lambda: refresh_meals(meals))
+
+
+@receiver(post_save, sender=Ingredient)
+def refresh_ingredient_meals(sender, instance, **kwargs):
+    meals = Meal.objects.filter(meal_ingredients__ingredient=instance)
+    transaction.on_commit(lambda: refresh_meals(meals))
+
+
+@receiver(post_save, sender=Dish)
+def schedule_fan_out(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: fan_out_dish.delay(instance.pk))
+
+
+@receiver(post_save, sender=ChefConnection)
+def schedule_follow_timeline(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: follow_timeline.delay(
+            instance.follower_id, instance.following_id
+        ))
+
+
+@receiver(post_delete, sender=ChefConnection)
+def schedule_unfollow_timeline(sender, instance, **kwargs):
+    transaction.on_commit(lambda: unfollow_timeline.delay(
+        instance.follower_id, instance.following_id
+    ))
+
+
+@receiver(post_save, sender=Bookmark)
+def schedule_similarity_update(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            lambda: update_dish_similarities.delay(instance.dish_id)
+        )
+
+
+def record_pantry_change(sender, instance, action='post_save', **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Dish):
+        dish_ids = [instance.pk]
+    elif isinstance(instance, DishProduct):
+        dish_ids = [instance.dish_id]
+    elif kwargs.get('pk_set'):
+        dish_ids = kwargs['pk_set']
+    else:
+        # Product.dishes.clear(): затронутые блюда неизвестны.
+        transaction.on_commit(bump_pantry_generation)
+        return
+    for dish_id in dish_ids:
+        transaction.on_commit(lambda pk=dish_id: record_change(pk))
+
+
+for model in (Dish, DishProduct):
+    post_save.connect(record_pantry_change, sender=model)
+    post_delete.connect(record_pantry_change, sender=model)
+m2m_changed.connect(record_pantry_change, sender=DishProduct)
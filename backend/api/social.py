@@ -0,0 +1,75 @@
+from recipes.models import Follow
+from users.models import ChefConnection
+
+
+class RelatedIdSet:
+    """
+    Множество id авторов, связанных с пользователем.
+    Загружается лениво и один раз за запрос. Если id текущей
+    страницы переданы через prime(), запрашиваются только они.
+    """
+
+    def __init__(self, queryset, field):
+        self.queryset = queryset
+        self.field = field
+        self._ids = None
+        self._checked = set()
+        self._found = set()
+
+    def prime(self, ids):
+        missing = set(ids) - self._checked
+        if self._ids is not None or not missing:
+            return
+        self._found.update(
+            self.queryset.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, flat=True)
+        )
+        self._checked |= missing
+
+    def __contains__(self, pk):
+        if pk in self._checked:
+            return pk in self._found
+        if self._ids is None:
+            self._ids = set(
+                self.queryset.values_list(self.field, flat=True)
+            )
+        return pk in self._ids
+
+
+class SocialGraph:
+    """Подписки текущего пользователя в пределах одного запроса."""
+
+    def __init__(self, user):
+        self.user = user
+        if user.is_anonymous:
+            self.following = self.subscriptions = frozenset()
+            return
+        self.following = RelatedIdSet(
+            ChefConnection.objects.filter(follower=user), 'following_id'
+        )
+        self.subscriptions = RelatedIdSet(
+            Follow.objects.filter(user=user), 'author_id'
+        )
+
+    def prime(self, ids):
+        if self.user.is_anonymous:
+            return
+        ids = set(ids)
+        self.following.prime(ids)
+        self.subscriptions.prime(ids)
+
+    def is_following(self, author):
+        return author.pk in self.following
+
+    def is_subscribed(self, author):
+        return author.pk in self.subscriptions
+
+
+def get_social_graph(request):
+    """Возвращает SocialGraph, общий для всех сериализаторов запроса."""
+    graph = getattr(request, '_social_graph', None)
+    if graph is None:
+        graph = SocialGraph(request.user)
+        request._social_graph = graph
+    return graph
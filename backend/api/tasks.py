@@ -0,0 +1,125 @@
+import tempfile
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from recipes.models import Dish, ShoppingListItem, ShoppingListJob
+from .cache import bump_generation
+from .feed import (
+    add_chef_to_timeline, is_celebrity, push_to_followers,
+    remove_chef_from_timeline, update_celebrity_status
+)
+from .images import RENDITION_FIELDS, build_renditions, delete_renditions
+from .recommendations import (
+    RebuildInProgress, rebuild_similarities, refresh_dish_similarities
+)
+from .utils import SHOPPING_LIST_RENDERERS
+
+
+@shared_task
+def render_shopping_list(job_id):
+    """Рендерит список покупок в файл хранилища и завершает задание."""
+    job = ShoppingListJob.objects.filter(
+        pk=job_id, status=ShoppingListJob.PENDING
+    ).first()
+    if job is None:
+        return
+    renderer = SHOPPING_LIST_RENDERERS[job.format]()
+    rows = ShoppingListItem.objects.filter(user_id=job.user_id).values_list(
+        'product__name', 'product__unit', 'amount'
+    ).order_by('product__name').iterator()
+    try:
+        with tempfile.SpooledTemporaryFile() as file:
+            for chunk in renderer.render(rows):
+                file.write(
+                    chunk.encode() if isinstance(chunk, str) else chunk
+                )
+            file.seek(0)
+            job.file.save(
+                f'{job.pk.hex}.{renderer.extension}', File(file), save=False
+            )
+        job.status = ShoppingListJob.DONE
+    except Exception:
+        job.status = ShoppingListJob.FAILED
+        raise
+    finally:
+        job.save(update_fields=['status', 'file'])
+
+
+@shared_task
+def delete_expired_shopping_list_jobs(batch_size=500):
+    """Удаляет просроченные задания выгрузки и их файлы."""
+    deleted = 0
+    while True:
+        jobs = list(ShoppingListJob.objects.filter(
+            expires_at__lte=timezone.now()
+        ).only('pk', 'file')[:batch_size])
+        if not jobs:
+            return deleted
+        for job in jobs:
+            if job.file:
+                default_storage.delete(job.file.name)
+        ShoppingListJob.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        deleted += len(jobs)
+
+
+@shared_task
+def generate_image_renditions(model_label, pk):
+    """Строит производные картинки и заменяет ими прежние."""
+    model = apps.get_model(model_label)
+    source_field, target_field = RENDITION_FIELDS[model_label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    image = getattr(instance, source_field)
+    previous = getattr(instance, target_field)
+    if not image or previous.get('source') == image.name:
+        return
+    renditions = build_renditions(image)
+    model.objects.filter(pk=pk).update(**{target_field: renditions})
+    # update() не отправляет post_save: блюда и аватары авторов
+    # отдаются в кешированных ответах пространства dishes.
+    bump_generation('dishes')
+    delete_renditions(previous)
+
+
+@shared_task
+def fan_out_dish(dish_id):
+    """Раздаёт новое блюдо в ленты подписчиков, кроме популярных авторов."""
+    dish = Dish.objects.select_related('creator').filter(pk=dish_id).first()
+    if dish is None or is_celebrity(dish.creator):
+        return
+    push_to_followers(dish)
+
+
+@shared_task
+def follow_timeline(user_id, chef_id):
+    if not update_celebrity_status(chef_id):
+        add_chef_to_timeline(user_id, chef_id)
+
+
+@shared_task
+def unfollow_timeline(user_id, chef_id):
+    remove_chef_from_timeline(user_id, chef_id)
+    update_celebrity_status(chef_id)
+
+
+@shared_task
+def rebuild_dish_similarities():
+    """Еженощный полный пересчёт соседей блюд."""
+    return rebuild_similarities()
+
+
+@shared_task(bind=True, max_retries=None)
+def update_dish_similarities(self, dish_id):
+    try:
+        refresh_dish_similarities(dish_id)
+    except RebuildInProgress as error:
+        # Обновим соседей уже в опубликованном новом поколении.
+        raise self.retry(
+            exc=error, countdown=settings.RECOMMENDATIONS_RETRY_DELAY
+        )
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Category, Dish, DishProduct, Product
+
+User = get_user_model()
+
+
+class DishQueryCountTests(TestCase):
+    """Бюджет запросов списка и карточки блюда, не зависящий от числа блюд."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create(
+            email='reader@example.com', username='reader'
+        )
+        cls.categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', color='#000000', slug=f'cat-{i}')
+            for i in range(3)
+        )
+        cls.products = Product.objects.bulk_create(
+            Product(name=f'Продукт {i}', unit='г') for i in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def create_dishes(self, count):
+        start = User.objects.count()
+        chefs = User.objects.bulk_create(
+            User(email=f'chef{i}@example.com', username=f'chef{i}')
+            for i in range(start, start + count)
+        )
+        dishes = Dish.objects.bulk_create(
+            Dish(
+                title=f'Блюдо {i}', description='Описание',
+                image='dishes/test.jpg', prep_time=10, creator=chef
+            )
+            for i, chef in enumerate(chefs)
+        )
+        Dish.categories.through.objects.bulk_create(
+            Dish.categories.through(dish=dish, category=category)
+            for dish in dishes
+            for category in self.categories
+        )
+        DishProduct.objects.bulk_create(
+            DishProduct(dish=dish, product=product, quantity=100)
+            for dish in dishes
+            for product in self.products
+        )
+        return dishes
+
+    def get(self, url, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        cache.clear()
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def assert_queries(self, build_url, queries, user=None):
+        """Ровно queries запросов и при 2, и при 10 блюдах."""
+        dishes = self.create_dishes(2)
+        with self.assertNumQueries(queries):
+            self.get(build_url(dishes), user)
+        dishes += self.create_dishes(8)
+        with self.assertNumQueries(queries):
+            self.get(build_url(dishes), user)
+
+    def test_list_anonymous(self):
+        # COUNT, страница блюд, категории, продукты.
+        self.assert_queries(lambda dishes: '/api/dishes/', 4)
+
+    def test_list_anonymous_cached(self):
+        self.create_dishes(2)
+        client = APIClient()
+        client.get('/api/dishes/')
+        with self.assertNumQueries(0):
+            response = client.get('/api/dishes/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_authenticated(self):
+        # Плюс подписки читателя на авторов страницы: ChefConnection, Follow.
+        self.assert_queries(lambda dishes: '/api/dishes/', 6, self.reader)
+
+    def test_detail_authenticated(self):
+        # Блюдо, категории, продукты, ChefConnection, Follow.
+        self.assert_queries(
+            lambda dishes: f'/api/dishes/{dishes[-1].pk}/', 5, self.reader
+        )
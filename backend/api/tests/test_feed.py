@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.feed import get_redis, timeline_key
+from foodgram.celery import app as celery_app
+from recipes.models import Dish
+from users.models import ChefConnection
+
+User = get_user_model()
+
+
+@override_settings(FEED_REDIS_URL='fakeredis://')
+class FeedTests(TestCase):
+
+    def setUp(self):
+        get_redis.cache_clear()
+        get_redis().flushall()
+        self.reader = User.objects.create(
+            email='reader@example.com', username='reader'
+        )
+        self.chef = User.objects.create(
+            email='chef@example.com', username='chef'
+        )
+        ChefConnection.objects.create(
+            follower=self.reader, following=self.chef
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+        # Задачи, отложенные через on_commit, выполняются сразу.
+        self.addCleanup(
+            setattr, celery_app.conf, 'task_always_eager',
+            celery_app.conf.task_always_eager
+        )
+        celery_app.conf.task_always_eager = True
+
+    def tearDown(self):
+        get_redis().flushall()
+        get_redis.cache_clear()
+
+    def create_dish(self, creator, title):
+        return Dish.objects.create(
+            title=title, description='Описание', image='dishes/test.jpg',
+            prep_time=10, creator=creator
+        )
+
+    def feed_ids(self, url='/api/feed/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [dish['id'] for dish in response.data['results']], (
+            response.data['next']
+        )
+
+    def test_feed_contains_followed_chef_dishes(self):
+        dish = self.create_dish(self.chef, 'Борщ')
+        stranger = User.objects.create(
+            email='stranger@example.com', username='stranger'
+        )
+        self.create_dish(stranger, 'Чужое блюдо')
+
+        ids, _ = self.feed_ids()
+
+        self.assertEqual(ids, [dish.pk])
+
+    def test_cursor_does_not_skip_dishes_with_equal_timestamp(self):
+        dishes = [self.create_dish(self.chef, f'Блюдо {i}') for i in range(3)]
+        Dish.objects.filter(pk__in=[d.pk for d in dishes]).update(
+            created_at=timezone.now()
+        )
+
+        seen = []
+        url = '/api/feed/?limit=1'
+        while url:
+            ids, url = self.feed_ids(url)
+            seen.extend(ids)
+
+        self.assertEqual(seen, sorted((d.pk for d in dishes), reverse=True))
+
+    def timeline_ids(self, user):
+        return [
+            int(pk) for pk in get_redis().zrange(timeline_key(user.pk), 0, -1)
+        ]
+
+    def test_new_dish_is_pushed_to_follower_timeline(self):
+        self.feed_ids()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            dish = self.create_dish(self.chef, 'Борщ')
+
+        self.assertEqual(self.timeline_ids(self.reader), [dish.pk])
+        ids, _ = self.feed_ids()
+        self.assertEqual(ids, [dish.pk])
+
+    def test_dish_of_new_celebrity_appears_once(self):
+        self.feed_ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            dish = self.create_dish(self.chef, 'Борщ')
+
+        with self.settings(FEED_CELEBRITY_THRESHOLD=0):
+            ids, _ = self.feed_ids()
+
+        self.assertEqual(ids, [dish.pk])
+
+    @override_settings(FEED_CELEBRITY_THRESHOLD=1)
+    def test_timelines_are_rebuilt_when_chef_becomes_celebrity(self):
+        dish = self.create_dish(self.chef, 'Борщ')
+        self.feed_ids()
+        self.assertEqual(self.timeline_ids(self.reader), [dish.pk])
+        fan = User.objects.create(email='fan@example.com', username='fan')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChefConnection.objects.create(follower=fan, following=self.chef)
+
+        self.assertFalse(get_redis().exists(timeline_key(self.reader.pk)))
+        ids, _ = self.feed_ids()
+        self.assertEqual(ids, [dish.pk])
+        self.assertEqual(self.timeline_ids(self.reader), [])
+
+    def test_empty_timeline_is_not_rebuilt_on_every_request(self):
+        ChefConnection.objects.all().delete()
+        self.feed_ids()
+
+        with mock.patch('api.feed.rebuild_timeline') as rebuild:
+            ids, _ = self.feed_ids()
+
+        self.assertEqual(ids, [])
+        rebuild.assert_not_called()
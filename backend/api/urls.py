@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
-    CategoryViewSet, DishViewSet,
-    ProductViewSet, UserViewSet
+    CategoryViewSet, DishViewSet, FeedViewSet, MealPlanViewSet,
+    MealViewSet, ProductViewSet, UserViewSet
 )
 
 router = DefaultRouter()
@@ -11,6 +11,9 @@ router.register('users', UserViewSet)
 router.register('categories', CategoryViewSet)
 router.register('products', ProductViewSet)
 router.register('dishes', DishViewSet)
+router.register('meals', MealViewSet)
+router.register('meal-plan', MealPlanViewSet, basename='meal-plan')
+router.register('feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,19 +1,181 @@
-from django.http import HttpResponse
+import csv
+import io
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import StreamingHttpResponse
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+from rest_framework.negotiation import BaseContentNegotiation
 
-def generate_shopping_list(ingredients):
-    shopping_list = ['Shopping List\n']
-    for ingredient in ingredients:
-        shopping_list.append(
-            f'{ingredient["product__name"]} - '
-            f'{ingredient["amount"]} {ingredient["product__unit"]}\n'
-        )
 
-    response = HttpResponse(
-        ''.join(shopping_list),
-        content_type='text/plain'
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Параметр ?format= выбирает формат файла, а не рендерер DRF,
+    поэтому ответ всегда отдаётся первым рендерером представления.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer:
+    """
+    Построчный рендерер списка покупок.
+    Строки — кортежи (название, единица измерения, количество).
+    """
+    content_type = None
+    extension = None
+    chunk_size = 64 * 1024
+
+    def __init__(self, title='Shopping List', footer=''):
+        self.title = title
+        self.footer = footer
+
+    def render(self, rows):
+        """Отдаёт вывод кусками не меньше chunk_size, а не по строке."""
+        buffer, size = [], 0
+        for part in self._render_parts(rows):
+            if not part:
+                continue
+            buffer.append(part)
+            size += len(part)
+            if size >= self.chunk_size:
+                yield buffer[0][:0].join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield buffer[0][:0].join(buffer)
+
+    def _render_parts(self, rows):
+        yield self.render_header()
+        for name, unit, amount in rows:
+            yield self.render_row(name, unit, amount)
+        yield self.render_footer()
+
+    def render_header(self):
+        return ''
+
+    def render_row(self, name, unit, amount):
+        raise NotImplementedError
+
+    def render_footer(self):
+        return ''
+
+
+class TextRenderer(ShoppingListRenderer):
+    content_type = 'text/plain; charset=utf-8'
+    extension = 'txt'
+
+    def render_header(self):
+        return f'{self.title}\n'
+
+    def render_row(self, name, unit, amount):
+        return f'{name} - {amount} {unit}\n'
+
+    def render_footer(self):
+        return f'\n{self.footer}\n' if self.footer else ''
+
+
+class CsvRenderer(ShoppingListRenderer):
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = csv.writer(Echo())
+
+    def render_header(self):
+        return self.writer.writerow(('name', 'amount', 'unit'))
+
+    def render_row(self, name, unit, amount):
+        return self.writer.writerow((name, amount, unit))
+
+
+class PdfRenderer(ShoppingListRenderer):
+    """
+    Формат PDF требует таблицу смещений в конце файла,
+    поэтому документ отдаётся одним куском после последней строки.
+    """
+    content_type = 'application/pdf'
+    extension = 'pdf'
+    font_name = 'ShoppingListFont'
+    font_size = 12
+    line_height = 18
+    margin = 50
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = io.BytesIO()
+        self.canvas = canvas.Canvas(self.buffer, pagesize=A4)
+        self.font = self._register_font()
+        self.y = None
+
+    def _register_font(self):
+        """
+        Встроенные шрифты PDF не содержат кириллицы, поэтому нужен
+        TTF из SHOPPING_LIST_PDF_FONT (в образе — DejaVuSans).
+        """
+        if self.font_name in pdfmetrics.getRegisteredFontNames():
+            return self.font_name
+        font_path = settings.SHOPPING_LIST_PDF_FONT
+        try:
+            pdfmetrics.registerFont(TTFont(self.font_name, font_path))
+        except (OSError, TypeError, TTFError) as error:
+            raise ImproperlyConfigured(
+                'SHOPPING_LIST_PDF_FONT must point to a TTF font with '
+                f'Cyrillic glyphs, got {font_path!r}: {error}'
+            )
+        return self.font_name
+
+    def _draw_line(self, text):
+        if self.y is None or self.y < self.margin:
+            if self.y is not None:
+                self.canvas.showPage()
+            self.canvas.setFont(self.font, self.font_size)
+            self.y = A4[1] - self.margin
+        self.canvas.drawString(self.margin, self.y, text)
+        self.y -= self.line_height
+
+    def render_header(self):
+        self._draw_line(self.title)
+        return b''
+
+    def render_row(self, name, unit, amount):
+        self._draw_line(f'{name} - {amount} {unit}')
+        return b''
+
+    def render_footer(self):
+        if self.footer:
+            self._draw_line(self.footer)
+        self.canvas.save()
+        return self.buffer.getvalue()
+
+
+SHOPPING_LIST_RENDERERS = {
+    renderer.extension: renderer
+    for renderer in (TextRenderer, CsvRenderer, PdfRenderer)
+}
+
+
+def generate_shopping_list(rows, file_format='txt', **kwargs):
+    renderer = SHOPPING_LIST_RENDERERS[file_format](**kwargs)
+    response = StreamingHttpResponse(
+        renderer.render(rows),
+        content_type=renderer.content_type
     )
     response['Content-Disposition'] = (
-        'attachment; filename="shopping_list.txt"'
+        f'attachment; filename="shopping_list.{renderer.extension}"'
     )
     return response
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import get_generation
+
+
+def missing_ids(queryset, ids, cache_namespace=None):
+    """
+    Id из ids, которых нет в queryset, по возрастанию.
+    Проверка одним запросом id__in, а для небольших справочников
+    с cache_namespace — по кешированному множеству всех id,
+    которое сбрасывается вместе с поколением кеша ответов.
+    """
+    ids = set(ids)
+    if not ids:
+        return []
+    if cache_namespace is None:
+        found = set(
+            queryset.filter(pk__in=ids).values_list('pk', flat=True)
+        )
+    else:
+        key = (
+            f'{cache_namespace}:ids:{queryset.model._meta.label_lower}:'
+            f'{get_generation(cache_namespace)}'
+        )
+        found = cache.get(key)
+        if found is None:
+            found = set(queryset.values_list('pk', flat=True))
+            cache.set(key, found, settings.API_CACHE_TIMEOUT)
+    return sorted(ids - found)
+
+
+def format_ids(ids):
+    return ', '.join(str(pk) for pk in ids)
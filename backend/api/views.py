@@ -1,32 +1,94 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Exists, F, OuterRef, Prefetch, Sum, Value, Window
+)
+from django.db.models.functions import RowNumber
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
 
-from .filters import DishFilter, ProductFilter
+from .cache import AnonymousCacheMixin
+from .feed import get_feed_page
+from .filters import DishFilter, MealFilter
+from .nutrition import get_nutrition
+from .pantry_index import pantry_index
+from .paginations import CursorPaginationMixin
+from .parsers import ImageMultiPartParser
 from .permissions import IsAuthorOrReadOnly
+from .product_index import product_index
+from .recommendations import current_generation
+from .renderers import SerializationTimingMixin
 from .serializers import (
     CategorySerializer, CustomUserCreateSerializer,
-    CustomUserSerializer, DishCreateSerializer,
-    DishReadSerializer, DishShortSerializer,
-    ProductSerializer, UserFollowSerializer
+    CustomUserSerializer, DishCreateSerializer, DishPantryMatchSerializer,
+    DishReadSerializer, DishShortSerializer, MealPlanDaySerializer,
+    MealReadSerializer, ProductSerializer, UserFollowSerializer
+)
+from .services import (
+    add_dish_to_shopping_list, meal_plan_shopping_list, meal_plan_week,
+    remove_dish_from_shopping_list, remove_dish_from_shopping_lists
+)
+from .social import get_social_graph
+from .tasks import render_shopping_list
+from .utils import (
+    SHOPPING_LIST_RENDERERS, IgnoreClientContentNegotiation,
+    generate_shopping_list
 )
 from recipes.models import (
     Category, Product, Dish, DishProduct,
-    Bookmark, MealPlan
+    Bookmark, Meal, MealIngredient, MealPlan, ShoppingListItem,
+    ShoppingListJob, current_weekday
 )
-from users.models import Follow
+from users.models import ChefConnection
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def with_dish_relations(queryset):
+    return queryset.select_related('creator').prefetch_related(
+        'categories',
+        Prefetch(
+            'dish_products',
+            queryset=DishProduct.objects.select_related('product')
+        )
+    )
+
+
+def annotate_dish_flags(queryset, user):
+    if user.is_anonymous:
+        return queryset.annotate(
+            is_bookmarked=Value(False),
+            is_in_meal_plan=Value(False)
+        )
+    return queryset.annotate(
+        is_bookmarked=Exists(
+            Bookmark.objects.filter(user=user, dish=OuterRef('pk'))
+        ),
+        is_in_meal_plan=Exists(
+            MealPlan.objects.filter(user=user, dish=OuterRef('pk'))
+        )
+    )
+
+
+class UserViewSet(
+    SerializationTimingMixin, CursorPaginationMixin, viewsets.ModelViewSet
+):
     queryset = User.objects.all()
+    cursor_ordering = ('-date_joined', '-id')
     serializer_class = CustomUserSerializer
     permission_classes = (IsAuthorOrReadOnly,)
 
@@ -37,6 +99,12 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserFollowSerializer
         return CustomUserSerializer
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            get_social_graph(self.request).prime(user.pk for user in page)
+        return page
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -52,7 +120,7 @@ class UserViewSet(viewsets.ModelViewSet):
                     {'error': 'You cannot follow yourself'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            if Follow.objects.filter(
+            if ChefConnection.objects.filter(
                 follower=user,
                 following=following
             ).exists():
@@ -60,17 +128,18 @@ class UserViewSet(viewsets.ModelViewSet):
                     {'error': 'You are already following this user'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            Follow.objects.create(follower=user, following=following)
+            ChefConnection.objects.create(
+                follower=user, following=following
+            )
             serializer = self.get_serializer(following)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == 'DELETE':
-            follow = Follow.objects.filter(
+            deleted, _ = ChefConnection.objects.filter(
                 follower=user,
                 following=following
-            )
-            if follow.exists():
-                follow.delete()
+            ).delete()
+            if deleted:
                 return Response(status=status.HTTP_204_NO_CONTENT)
             return Response(
                 {'error': 'You are not following this user'},
@@ -83,43 +152,208 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def followers(self, request):
         user = request.user
-        following = User.objects.filter(following__follower=user)
+        limit = self._get_dishes_limit(request)
+        following = User.objects.filter(followers__follower=user)
         page = self.paginate_queryset(following)
+        authors = page if page is not None else list(following)
+        self._attach_recent_dishes(authors, limit)
+        serializer = self.get_serializer(authors, many=True)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
-        serializer = self.get_serializer(following, many=True)
         return Response(serializer.data)
 
+    def _get_dishes_limit(self, request):
+        max_limit = settings.DISHES_LIMIT_MAX
+        limit = request.query_params.get('dishes_limit')
+        if limit is None:
+            return max_limit
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError(
+                {'dishes_limit': 'Must be a positive integer'}
+            )
+        return min(int(limit), max_limit)
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    def _attach_recent_dishes(self, authors, limit):
+        """Последние блюда всех авторов страницы одним запросом."""
+        dishes = Dish.objects.filter(creator__in=authors).annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('creator_id'),
+                order_by=(F('created_at').desc(), F('id').desc())
+            )
+        ).filter(row_number__lte=limit).order_by('row_number')
+        dishes_by_author = defaultdict(list)
+        for dish in dishes:
+            dishes_by_author[dish.creator_id].append(dish)
+        for author in authors:
+            author.recent_dishes = dishes_by_author[author.pk]
+
+
+class CategoryViewSet(
+    SerializationTimingMixin, AnonymousCacheMixin,
+    viewsets.ReadOnlyModelViewSet
+):
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = None
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(
+    SerializationTimingMixin, AnonymousCacheMixin,
+    viewsets.ReadOnlyModelViewSet
+):
+    cache_namespace = 'products'
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = ProductFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return self._cached(self._search, request, *args, **kwargs)
 
-class DishViewSet(viewsets.ModelViewSet):
+    def _search(self, request, *args, **kwargs):
+        max_limit = settings.PRODUCT_SEARCH_LIMIT
+        limit = request.query_params.get('limit')
+        if limit is not None and (not limit.isdigit() or int(limit) < 1):
+            raise ValidationError({'limit': 'Must be a positive integer'})
+        products = product_index.search(
+            request.query_params.get('name', ''),
+            min(int(limit or max_limit), max_limit)
+        )
+        serializer = self.get_serializer(products, many=True)
+        return Response(serializer.data)
+
+
+class DishViewSet(
+    SerializationTimingMixin, AnonymousCacheMixin, CursorPaginationMixin,
+    viewsets.ModelViewSet
+):
+    cache_namespace = 'dishes'
     queryset = Dish.objects.all()
+    cursor_ordering = ('-created_at', '-id')
     permission_classes = (IsAuthorOrReadOnly,)
+    parser_classes = (JSONParser, ImageMultiPartParser)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = DishFilter
 
+    def get_queryset(self):
+        queryset = Dish.objects.all()
+        if self.action in ('list', 'retrieve', 'similar', 'recommended'):
+            queryset = with_dish_relations(queryset)
+        return annotate_dish_flags(queryset, self.request.user)
+
     def get_serializer_class(self):
         if self.action in ('create', 'partial_update'):
             return DishCreateSerializer
         return DishReadSerializer
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            get_social_graph(self.request).prime(
+                dish.creator_id for dish in page
+            )
+        return page
+
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        remove_dish_from_shopping_lists(instance)
+        instance.delete()
+
+    def _get_recommendations_limit(self, request):
+        max_limit = settings.RECOMMENDATIONS_TOP_K
+        limit = request.query_params.get('limit')
+        if limit is None:
+            return max_limit
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({'limit': 'Must be a positive integer'})
+        return min(int(limit), max_limit)
+
+    def _dish_list_response(self, dishes):
+        dishes = list(dishes)
+        get_social_graph(self.request).prime(
+            dish.creator_id for dish in dishes
+        )
+        return Response(self.get_serializer(dishes, many=True).data)
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        dish = self.get_object()
+        limit = self._get_recommendations_limit(request)
+        return self._dish_list_response(
+            self.get_queryset().filter(
+                similar_to__dish=dish,
+                similar_to__generation=current_generation()
+            ).order_by('-similar_to__score')[:limit]
+        )
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def recommended(self, request):
+        """
+        Соседи блюд из закладок пользователя, ранжированные по сумме мер.
+        Без закладок — самые популярные блюда.
+        """
+        user = request.user
+        limit = self._get_recommendations_limit(request)
+        queryset = self.get_queryset().exclude(bookmarks__user=user)
+        if Bookmark.objects.filter(user=user).exists():
+            queryset = queryset.filter(
+                similar_to__dish__bookmarks__user=user,
+                similar_to__generation=current_generation()
+            ).annotate(
+                recommendation_score=Sum('similar_to__score')
+            ).order_by('-recommendation_score', '-created_at')
+        else:
+            queryset = queryset.order_by('-bookmarks_count', '-created_at')
+        return self._dish_list_response(queryset[:limit])
+
+    @action(detail=False, url_path='pantry-match')
+    def pantry_match(self, request):
+        """
+        Блюда по продуктам ?products=1,2,3 из кладовой пользователя,
+        ?max_missing= ограничивает число недостающих продуктов.
+        """
+        params = request.query_params
+        try:
+            product_ids = [
+                int(pk) for pk in params.get('products', '').split(',')
+                if pk.strip()
+            ]
+        except ValueError:
+            raise ValidationError({'products': 'Must be a list of ids'})
+        if not product_ids:
+            raise ValidationError({'products': 'This parameter is required'})
+        max_missing = params.get('max_missing')
+        if max_missing is not None and not max_missing.isdigit():
+            raise ValidationError(
+                {'max_missing': 'Must be a non-negative integer'}
+            )
+        limit = params.get('limit', str(settings.PANTRY_MATCH_LIMIT))
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({'limit': 'Must be a positive integer'})
+        matches = pantry_index.match(
+            product_ids,
+            min(int(limit), settings.PANTRY_MATCH_LIMIT),
+            None if max_missing is None else int(max_missing)
+        )
+        dishes = Dish.objects.in_bulk([match[0] for match in matches])
+        page = []
+        for dish_id, matched, missing, coverage in matches:
+            dish = dishes.get(dish_id)
+            if dish is None:
+                continue
+            dish.matched_count = matched
+            dish.missing_count = missing
+            dish.coverage = coverage
+            page.append(dish)
+        serializer = DishPantryMatchSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
     @action(
         detail=True,
         methods=['post', 'delete'],
@@ -135,14 +369,16 @@ class DishViewSet(viewsets.ModelViewSet):
                     {'error': 'Dish is already bookmarked'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            Bookmark.objects.create(user=user, dish=dish)
+            with transaction.atomic():
+                Bookmark.objects.create(user=user, dish=dish)
             serializer = DishShortSerializer(dish)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == 'DELETE':
             bookmark = Bookmark.objects.filter(user=user, dish=dish)
             if bookmark.exists():
-                bookmark.delete()
+                with transaction.atomic():
+                    bookmark.delete()
                 return Response(status=status.HTTP_204_NO_CONTENT)
             return Response(
                 {'error': 'Dish is not bookmarked'},
@@ -159,19 +395,28 @@ class DishViewSet(viewsets.ModelViewSet):
         dish = get_object_or_404(Dish, pk=pk)
 
         if request.method == 'POST':
+            day = request.data.get('day') or current_weekday()
+            if day not in dict(MealPlan.DAYS_OF_WEEK):
+                raise ValidationError({'day': 'Unknown day of week'})
             if MealPlan.objects.filter(user=user, dish=dish).exists():
                 return Response(
                     {'error': 'Dish is already in meal plan'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            MealPlan.objects.create(user=user, dish=dish)
+            with transaction.atomic():
+                MealPlan.objects.create(user=user, dish=dish, day=day)
+                add_dish_to_shopping_list(user, dish)
             serializer = DishShortSerializer(dish)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == 'DELETE':
-            meal_plan = MealPlan.objects.filter(user=user, dish=dish)
-            if meal_plan.exists():
-                meal_plan.delete()
+            with transaction.atomic():
+                deleted, _ = MealPlan.objects.filter(
+                    user=user, dish=dish
+                ).delete()
+                if deleted:
+                    remove_dish_from_shopping_list(user, dish)
+            if deleted:
                 return Response(status=status.HTTP_204_NO_CONTENT)
             return Response(
                 {'error': 'Dish is not in meal plan'},
@@ -180,35 +425,252 @@ class DishViewSet(viewsets.ModelViewSet):
 
     @action(
         detail=False,
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        content_negotiation_class=IgnoreClientContentNegotiation
     )
     def download_shopping_list(self, request):
         user = request.user
-        if not MealPlan.objects.filter(user=user).exists():
+        file_format = request.query_params.get('format', 'txt')
+        if file_format not in SHOPPING_LIST_RENDERERS:
+            return Response(
+                {'error': 'Unsupported format, use one of: '
+                          f'{", ".join(SHOPPING_LIST_RENDERERS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ingredients = ShoppingListItem.objects.filter(
+            user=user
+        ).values_list(
+            'product__name',
+            'product__unit',
+            'amount'
+        ).order_by('product__name')
+        if not ingredients.exists():
             return Response(
                 {'error': 'Shopping list is empty'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        ingredients = DishProduct.objects.filter(
-            dish__meal_plans__user=user
-        ).values(
-            'product__name',
-            'product__unit'
-        ).annotate(amount=Sum('quantity'))
+        return generate_shopping_list(ingredients.iterator(), file_format)
 
-        shopping_list = ['Shopping List\n']
-        for ingredient in ingredients:
-            shopping_list.append(
-                f'{ingredient["product__name"]} - '
-                f'{ingredient["amount"]} {ingredient["product__unit"]}\n'
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated],
+        content_negotiation_class=IgnoreClientContentNegotiation
+    )
+    def prepare_shopping_list(self, request):
+        user = request.user
+        file_format = request.query_params.get('format', 'txt')
+        if file_format not in SHOPPING_LIST_RENDERERS:
+            return Response(
+                {'error': 'Unsupported format, use one of: '
+                          f'{", ".join(SHOPPING_LIST_RENDERERS)}'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        if not ShoppingListItem.objects.filter(user=user).exists():
+            return Response(
+                {'error': 'Shopping list is empty'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        now = timezone.now()
+        pending = ShoppingListJob.objects.filter(
+            user=user, status=ShoppingListJob.PENDING
+        )
+        # Задание, зависшее дольше блокировки, считается упавшим.
+        pending.filter(created_at__lt=now - timedelta(
+            seconds=settings.SHOPPING_LIST_LOCK_TIMEOUT
+        )).update(status=ShoppingListJob.FAILED)
+        try:
+            with transaction.atomic():
+                job = ShoppingListJob.objects.create(
+                    user=user, format=file_format,
+                    expires_at=now + timedelta(
+                        seconds=settings.SHOPPING_LIST_JOB_TIMEOUT
+                    )
+                )
+        except IntegrityError:
+            job = pending.first()
+            if job is None:
+                raise
+            return self._shopping_list_job_response(job)
+        transaction.on_commit(lambda: render_shopping_list.delay(job.pk.hex))
+        return self._shopping_list_job_response(job)
+
+    @action(
+        detail=False,
+        url_path=r'shopping_list_jobs/(?P<job_id>[0-9a-f]{32})',
+        permission_classes=[IsAuthenticated]
+    )
+    def shopping_list_job(self, request, job_id=None):
+        return self._shopping_list_job_response(self._get_own_job(job_id))
+
+    @action(
+        detail=False,
+        url_path=r'shopping_list_jobs/(?P<job_id>[0-9a-f]{32})/download',
+        permission_classes=[IsAuthenticated]
+    )
+    def shopping_list_job_download(self, request, job_id=None):
+        job = self._get_own_job(job_id)
+        if job.status != ShoppingListJob.DONE:
+            return Response(
+                {'error': 'Shopping list is not ready'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=f'shopping_list.{job.format}'
+        )
+
+    def _get_own_job(self, job_id):
+        return get_object_or_404(
+            ShoppingListJob, pk=job_id, user=self.request.user,
+            expires_at__gt=timezone.now()
+        )
+
+    def _shopping_list_job_response(self, job):
+        data = {'job_id': job.pk.hex, 'status': job.status}
+        if job.status == ShoppingListJob.DONE:
+            data['download'] = reverse(
+                'dish-shopping-list-job-download',
+                kwargs={'job_id': job.pk.hex},
+                request=self.request
+            )
+        if job.status == ShoppingListJob.PENDING:
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        return Response(data)
+
+
+class MealViewSet(SerializationTimingMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Meal.objects.select_related('chef').prefetch_related(
+        Prefetch(
+            'meal_ingredients',
+            queryset=MealIngredient.objects.select_related('ingredient')
+        )
+    )
+    serializer_class = MealReadSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = MealFilter
 
-        response = HttpResponse(
-            ''.join(shopping_list),
-            content_type='text/plain'
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.nutrition = get_nutrition(page)
+            get_social_graph(self.request).prime(
+                meal.chef_id for meal in page
+            )
+        return page
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['nutrition'] = getattr(self, 'nutrition', {})
+        return context
+
+
+class MealPlanViewSet(SerializationTimingMixin, viewsets.GenericViewSet):
+    queryset = MealPlan.objects.all()
+    serializer_class = MealPlanDaySerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+
+    def _get_days(self):
+        """?days=monday,friday — подмножество дней недели в её порядке."""
+        all_days = [day for day, _ in MealPlan.DAYS_OF_WEEK]
+        value = self.request.query_params.get('days')
+        if not value:
+            return all_days
+        days = {day.strip().lower() for day in value.split(',') if day.strip()}
+        unknown = days - set(all_days)
+        if unknown:
+            raise ValidationError({
+                'days': f'Unknown days: {", ".join(sorted(unknown))}'
+            })
+        return [day for day in all_days if day in days]
+
+    @action(detail=False)
+    def week(self, request):
+        week = meal_plan_week(request.user, self._get_days())
+        serializer = self.get_serializer(week, many=True)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        url_path='week/download_shopping_list',
+        content_negotiation_class=IgnoreClientContentNegotiation
+    )
+    def download_shopping_list(self, request):
+        file_format = request.query_params.get('format', 'txt')
+        if file_format not in SHOPPING_LIST_RENDERERS:
+            return Response(
+                {'error': 'Unsupported format, use one of: '
+                          f'{", ".join(SHOPPING_LIST_RENDERERS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        rows = meal_plan_shopping_list(
+            meal_plan_week(request.user, self._get_days())
         )
-        response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.txt"'
+        if not rows:
+            return Response(
+                {'error': 'Shopping list is empty'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return generate_shopping_list(rows, file_format)
+
+
+class FeedViewSet(SerializationTimingMixin, viewsets.GenericViewSet):
+    """
+    Лента новых блюд авторов, на которых подписан пользователь.
+    Постраничная навигация по ?before=<метка времени>:<id> и ?limit=.
+    """
+    queryset = Dish.objects.all()
+    serializer_class = DishReadSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def _get_param(self, name, cast, default):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return default
+        try:
+            value = cast(value)
+        except ValueError:
+            raise ValidationError({name: 'Must be a number'})
+        if value <= 0:
+            raise ValidationError({name: 'Must be positive'})
+        return value
+
+    def _get_cursor(self):
+        value = self.request.query_params.get('before')
+        if value is None:
+            return None
+        try:
+            score, pk = value.split(':')
+            return float(score), int(pk)
+        except ValueError:
+            raise ValidationError({'before': 'Must be <timestamp>:<id>'})
+
+    def list(self, request):
+        limit = min(
+            self._get_param('limit', int, settings.REST_FRAMEWORK['PAGE_SIZE']),
+            settings.API_MAX_PAGE_SIZE
         )
-        return response
+        entries = get_feed_page(request.user, limit, self._get_cursor())
+        dishes = annotate_dish_flags(
+            with_dish_relations(Dish.objects.filter(
+                pk__in=[pk for pk, _ in entries]
+            )),
+            request.user
+        ).in_bulk()
+        # Удалённые блюда могут ещё оставаться в ленте Redis.
+        page = [dishes[pk] for pk, _ in entries if pk in dishes]
+        get_social_graph(request).prime(dish.creator_id for dish in page)
+        next_url = None
+        if len(entries) == limit:
+            pk, score = entries[-1]
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'before', f'{score}:{pk}'
+            )
+        return Response({
+            'next': next_url,
+            'results': self.get_serializer(page, many=True).data,
+        })
@@ -0,0 +1,145 @@
+"""
+Бенчмарки горячих эндпоинтов через тестовый клиент DRF.
+
+    python -m benchmarks.run --scale 2 --iterations 50
+    python -m benchmarks.run --update-baseline
+
+Сравнивает число SQL-запросов и p95 с benchmarks/baseline.json
+и завершается с кодом 1 при регрессии, с кодом 2 — если baseline
+записан для другого масштаба или БД. При первом запуске baseline
+записывается из текущих измерений.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+os.environ.setdefault('CACHE_URL', 'locmem://')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext, setup_test_environment
+)
+from rest_framework.test import APIClient  # noqa: E402
+
+from benchmarks.scenarios import SCENARIOS  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def measure(client, url, iterations, warmup):
+    timings = []
+    queries = 0
+    for iteration in range(warmup + iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} returned {response.status_code}')
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(captured))
+    return {
+        'p50_ms': round(percentile(timings, 0.50), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'p99_ms': round(percentile(timings, 0.99), 2),
+        'queries': queries,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Список регрессий относительно сохранённого baseline."""
+    failures = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            failures.append(f'{name}: no baseline, run --update-baseline')
+            continue
+        if result['queries'] > expected['queries']:
+            failures.append(
+                f'{name}: {result["queries"]} queries, '
+                f'baseline {expected["queries"]}'
+            )
+        limit = expected['p95_ms'] * (1 + threshold)
+        if result['p95_ms'] > limit:
+            failures.append(
+                f'{name}: p95 {result["p95_ms"]}ms, '
+                f'baseline {expected["p95_ms"]}ms (+{threshold:.0%})'
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument(
+        '--threshold', type=float, default=0.25,
+        help='допустимый рост p95 относительно baseline (0.25 = 25%%)'
+    )
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--only', nargs='*', help='имена сценариев')
+    options = parser.parse_args(argv)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        data = seed(options.scale)
+        results = {}
+        for name, build_url in SCENARIOS:
+            if options.only and name not in options.only:
+                continue
+            client = APIClient()
+            client.force_authenticate(data['reader'])
+            results[name] = measure(
+                client, build_url(data), options.iterations, options.warmup
+            )
+            print(f'{name:28} {json.dumps(results[name])}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {
+        'scale': options.scale,
+        'database': connection.vendor,
+        'results': results,
+    }
+    if options.update_baseline or not options.baseline.exists():
+        options.baseline.write_text(
+            json.dumps(report, indent=2, ensure_ascii=False) + '\n'
+        )
+        print(f'Baseline written to {options.baseline}')
+        return 0
+    baseline = json.loads(options.baseline.read_text())
+    if (baseline['scale'], baseline['database']) != (
+        options.scale, connection.vendor
+    ):
+        print(f'Baseline was recorded with scale {baseline["scale"]} '
+              f'on {baseline["database"]}', file=sys.stderr)
+        return 2
+    failures = compare(results, baseline['results'], options.threshold)
+    for failure in failures:
+        print(f'REGRESSION {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
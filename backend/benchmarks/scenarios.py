@@ -0,0 +1,13 @@
+# Сценарий: (название, URL по данным seed()). Все запросы идут от
+# читателя: анонимные list и retrieve отдаются из кеша ответов
+# и не проходят путь запросов к БД, который здесь измеряется.
+SCENARIOS = (
+    ('dish_list', lambda data: '/api/dishes/'),
+    ('dish_detail', lambda data: f'/api/dishes/{data["dish"].pk}/'),
+    ('products_autocomplete', lambda data: '/api/products/?name=Прод'),
+    ('user_followers', lambda data: '/api/users/followers/'),
+    (
+        'download_shopping_list',
+        lambda data: '/api/dishes/download_shopping_list/'
+    ),
+)
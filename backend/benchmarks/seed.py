@@ -0,0 +1,82 @@
+import random
+
+from django.contrib.auth import get_user_model
+
+from recipes.models import (
+    Bookmark, Category, Dish, DishProduct, MealPlan, Product,
+    ShoppingListItem
+)
+from users.models import ChefConnection
+
+User = get_user_model()
+
+
+def seed(scale=1, random_seed=42):
+    """
+    Синтетический набор данных: scale=1 — 50 авторов, 500 блюд,
+    1000 продуктов. Возвращает словарь с объектами для сценариев.
+    """
+    rng = random.Random(random_seed)
+    users = User.objects.bulk_create(
+        User(
+            email=f'bench{index}@example.com',
+            username=f'bench{index}',
+            first_name='Bench',
+            last_name=str(index),
+            password='!'
+        )
+        for index in range(50 * scale)
+    )
+    categories = Category.objects.bulk_create(
+        Category(name=f'Category {index}', color='#000000',
+                 slug=f'category-{index}')
+        for index in range(10)
+    )
+    products = Product.objects.bulk_create(
+        Product(name=f'Продукт {index:05d}', unit='г')
+        for index in range(1000 * scale)
+    )
+    dishes = Dish.objects.bulk_create(
+        Dish(
+            title=f'Блюдо {index}',
+            description='Описание блюда ' * 10,
+            image='dishes/bench.jpg',
+            prep_time=rng.randint(5, 120),
+            creator=rng.choice(users)
+        )
+        for index in range(500 * scale)
+    )
+    Dish.categories.through.objects.bulk_create(
+        Dish.categories.through(dish=dish, category=category)
+        for dish in dishes
+        for category in rng.sample(categories, 2)
+    )
+    DishProduct.objects.bulk_create(
+        DishProduct(dish=dish, product=product,
+                    quantity=rng.randint(1, 500))
+        for dish in dishes
+        for product in rng.sample(products, 8)
+    )
+    reader = users[0]
+    Bookmark.objects.bulk_create(
+        Bookmark(user=user, dish=dish)
+        for user in users
+        for dish in rng.sample(dishes, 10)
+    )
+    ChefConnection.objects.bulk_create(
+        ChefConnection(follower=reader, following=user) for user in users[1:]
+    )
+    planned = rng.sample(dishes, 20)
+    MealPlan.objects.bulk_create(
+        MealPlan(user=reader, dish=dish) for dish in planned
+    )
+    amounts = {}
+    for dish_product in DishProduct.objects.filter(dish__in=planned):
+        amounts[dish_product.product_id] = (
+            amounts.get(dish_product.product_id, 0) + dish_product.quantity
+        )
+    ShoppingListItem.objects.bulk_create(
+        ShoppingListItem(user=reader, product_id=product_id, amount=amount)
+        for product_id, amount in amounts.items()
+    )
+    return {'reader': reader, 'dish': dishes[0]}
@@ -0,0 +1,31 @@
+"""
+Настройки прогона бенчмарков: локальная БД без сети,
+кеш в памяти процесса и синхронные задачи Celery.
+BENCHMARK_DB=postgres использует БД из основных настроек.
+"""
+import os
+import tempfile
+
+from foodgram.settings import *  # noqa: F401,F403
+
+if os.getenv('BENCHMARK_DB', 'sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(tempfile.gettempdir(), 'foodgram_bench.sqlite3'),
+            'TEST': {'NAME': os.path.join(
+                tempfile.gettempdir(), 'foodgram_bench_test.sqlite3'
+            )},
+        }
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+FEED_REDIS_URL = 'fakeredis://'
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+SERVER_TIMING_ENABLED = False
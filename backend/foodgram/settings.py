@@ -1,6 +1,9 @@
 import os
+import sys
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,6 +33,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
@@ -40,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +88,31 @@ DATABASES = {
     }
 }
 
+# Shared cache for API responses, invalidation counters, the product index
+# version, the pantry change log and shopping list job state. Web and Celery
+# processes must see the same cache, so outside DEBUG and tests CACHE_URL has
+# to point at Redis; locmem:// opts into a process-local cache explicitly.
+TESTING = sys.argv[1:2] == ['test']
+CACHE_URL = os.getenv('CACHE_URL', 'locmem://' if DEBUG or TESTING else '')
+if not CACHE_URL:
+    raise ImproperlyConfigured('CACHE_URL must point at a shared Redis cache')
+if CACHE_URL.startswith('locmem://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+
+# Seconds an anonymous API response stays cached.
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -121,7 +151,7 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-AUTH_USER_MODEL = 'users.User'
+AUTH_USER_MODEL = 'users.Chef'
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -130,10 +160,68 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 6,
 }
 
+# Emit Server-Timing headers (db, serialize, render, app, total) on
+# non-streaming responses.
+# /metrics aggregates across gunicorn workers when PROMETHEUS_MULTIPROC_DIR
+# points to a shared writable directory.
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True') == 'True'
+
+# /metrics is served only to METRICS_ALLOWED_IPS or to requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = os.getenv(
+    'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+).split(',')
+
+# Upper bound for ?limit= on paginated lists.
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 50))
+
+# Upper bound for ?dishes_limit= in the followers list.
+DISHES_LIMIT_MAX = int(os.getenv('DISHES_LIMIT_MAX', 20))
+
+# PostgreSQL text search configuration used for dish search.
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'russian')
+
+# Maximum number of products returned by the autocomplete endpoint.
+PRODUCT_SEARCH_LIMIT = int(os.getenv('PRODUCT_SEARCH_LIMIT', 20))
+
+# Lifetime of background shopping-list jobs (expired files are deleted
+# hourly) and the age after which a pending job stops blocking new ones.
+SHOPPING_LIST_JOB_TIMEOUT = int(os.getenv('SHOPPING_LIST_JOB_TIMEOUT', 86400))
+SHOPPING_LIST_LOCK_TIMEOUT = int(os.getenv('SHOPPING_LIST_LOCK_TIMEOUT', 300))
+
+# Limits for uploaded dish images and avatars.
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv('IMAGE_UPLOAD_MAX_SIZE', 5 * 1024 * 1024))
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', 4096))
+
+# Number of neighbours stored per dish for recommendations.
+RECOMMENDATIONS_TOP_K = int(os.getenv('RECOMMENDATIONS_TOP_K', 20))
+# Seconds before a per-dish neighbour update retries while the nightly
+# rebuild holds the similarity lock.
+RECOMMENDATIONS_RETRY_DELAY = int(os.getenv('RECOMMENDATIONS_RETRY_DELAY', 60))
+
+# Pantry search: result cap and the longest change log applied to the
+# in-memory index before it is rebuilt from scratch.
+PANTRY_MATCH_LIMIT = int(os.getenv('PANTRY_MATCH_LIMIT', 20))
+PANTRY_INDEX_MAX_PATCH = int(os.getenv('PANTRY_INDEX_MAX_PATCH', 1000))
+
+# Lifetime of cached meal nutrition totals.
+NUTRITION_CACHE_TIMEOUT = int(os.getenv('NUTRITION_CACHE_TIMEOUT', 86400))
+
+# TTF font with Cyrillic glyphs for PDF shopping lists. The Docker image
+# ships DejaVuSans (fonts-dejavu-core); PDF export fails loudly without it.
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    'SHOPPING_LIST_PDF_FONT', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'HIDE_USERS': False,
@@ -156,3 +244,25 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
+# Per-user feed timelines (Redis sorted sets). Dishes of chefs with more
+# followers than the threshold are pulled at read time instead of fanned out.
+FEED_REDIS_URL = os.getenv('FEED_REDIS_URL', CELERY_BROKER_URL)
+FEED_TIMELINE_SIZE = int(os.getenv('FEED_TIMELINE_SIZE', 500))
+FEED_CELEBRITY_THRESHOLD = int(os.getenv('FEED_CELEBRITY_THRESHOLD', 10000))
+
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-counters': {
+        'task': 'recipes.tasks.reconcile_counters',
+        'schedule': 60 * 60,
+    },
+    'delete-expired-shopping-list-jobs': {
+        'task': 'api.tasks.delete_expired_shopping_list_jobs',
+        'schedule': 60 * 60,
+    },
+    'rebuild-dish-similarities': {
+        'task': 'api.tasks.rebuild_dish_similarities',
+        'schedule': crontab(hour=3, minute=0),
+    },
+}
@@ -3,10 +3,13 @@ from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from api.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('api/auth/', include('djoser.urls.authtoken')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
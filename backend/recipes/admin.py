@@ -2,7 +2,7 @@ from django.contrib import admin
 
 from .models import (
     Category, Product, Dish, DishProduct,
-    Bookmark, MealPlan
+    Bookmark, MealPlan, ShoppingListItem, ShoppingListJob
 )
 
 
@@ -43,6 +43,20 @@ class BookmarkAdmin(admin.ModelAdmin):
 
 @admin.register(MealPlan)
 class MealPlanAdmin(admin.ModelAdmin):
-    list_display = ('user', 'dish')
+    list_display = ('user', 'dish', 'day')
     search_fields = ('user__email', 'dish__title')
-    list_filter = ('user', 'dish')
+    list_filter = ('user', 'dish', 'day')
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ('user', 'product', 'amount')
+    search_fields = ('user__email', 'product__name')
+    list_filter = ('user',)
+
+
+@admin.register(ShoppingListJob)
+class ShoppingListJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'format', 'status', 'created_at', 'expires_at')
+    search_fields = ('user__email',)
+    list_filter = ('status', 'format')
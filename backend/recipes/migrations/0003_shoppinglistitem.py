@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+
+def build_shopping_lists(apps, schema_editor):
+    DishProduct = apps.get_model('recipes', 'DishProduct')
+    ShoppingListItem = apps.get_model('recipes', 'ShoppingListItem')
+    totals = DishProduct.objects.filter(
+        dish__meal_plans__isnull=False
+    ).values_list(
+        'dish__meal_plans__user_id', 'product_id'
+    ).annotate(amount=Sum('quantity')).order_by()
+    ShoppingListItem.objects.bulk_create(
+        (
+            ShoppingListItem(
+                user_id=user_id, product_id=product_id, amount=amount
+            )
+            for user_id, product_id, amount in totals.iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingListItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(verbose_name='Amount')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list_items', to='recipes.product', verbose_name='Product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list_items', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Shopping list item',
+                'verbose_name_plural': 'Shopping list items',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglistitem',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='unique_shopping_list_item'),
+        ),
+        migrations.RunPython(build_shopping_lists, migrations.RunPython.noop),
+    ]
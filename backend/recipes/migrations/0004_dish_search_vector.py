@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import migrations
+
+INDEXES = (
+    ('recipes_dish_search_vector_gin', 'search_vector'),
+    ('recipes_dish_title_trgm_gin', 'title gin_trgm_ops'),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, expression in INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON recipes_dish USING gin ({expression})'
+        )
+    Dish = apps.get_model('recipes', 'Dish')
+    Dish.objects.update(
+        search_vector=(
+            SearchVector('title', weight='A', config=settings.SEARCH_CONFIG)
+            + SearchVector(
+                'description', weight='B', config=settings.SEARCH_CONFIG
+            )
+        )
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_shoppinglistitem'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='dish',
+            name='search_vector',
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
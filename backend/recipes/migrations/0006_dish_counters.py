@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_dish_relations(apps, schema_editor):
+    Dish = apps.get_model('recipes', 'Dish')
+    for field, model_name in (
+        ('bookmarks_count', 'Bookmark'),
+        ('meal_plans_count', 'MealPlan'),
+    ):
+        model = apps.get_model('recipes', model_name)
+        counts = model.objects.filter(
+            dish=OuterRef('pk')
+        ).values('dish').annotate(count=Count('pk')).values('count')
+        Dish.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_dish_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='bookmarks_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Bookmarks count'),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='meal_plans_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Meal plans count'),
+        ),
+        migrations.RunPython(count_dish_relations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_dish_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Image renditions'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_dish_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DishSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('dish', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='recipes.dish', verbose_name='Dish')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='recipes.dish', verbose_name='Similar dish')),
+            ],
+            options={
+                'verbose_name': 'Dish similarity',
+                'verbose_name_plural': 'Dish similarities',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dishsimilarity',
+            constraint=models.UniqueConstraint(fields=('dish', 'similar'), name='unique_dish_similarity'),
+        ),
+        migrations.AddIndex(
+            model_name='dishsimilarity',
+            index=models.Index(fields=['dish', '-score'], name='dish_similarity_score_idx'),
+        ),
+    ]
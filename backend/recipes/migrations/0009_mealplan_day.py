@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+import recipes.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_dishsimilarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealplan',
+            name='day',
+            field=models.CharField(choices=[('monday', 'Monday'), ('tuesday', 'Tuesday'), ('wednesday', 'Wednesday'), ('thursday', 'Thursday'), ('friday', 'Friday'), ('saturday', 'Saturday'), ('sunday', 'Sunday')], default=recipes.models.current_weekday, max_length=9, verbose_name='Day of week'),
+        ),
+        migrations.AddIndex(
+            model_name='mealplan',
+            index=models.Index(fields=['user', 'day'], name='meal_plan_user_day_idx'),
+        ),
+    ]
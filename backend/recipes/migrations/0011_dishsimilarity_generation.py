@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_shoppinglistjob'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dishsimilarity',
+            name='unique_dish_similarity',
+        ),
+        migrations.RemoveIndex(
+            model_name='dishsimilarity',
+            name='dish_similarity_score_idx',
+        ),
+        migrations.AddField(
+            model_name='dishsimilarity',
+            name='generation',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Generation'),
+        ),
+        migrations.AddConstraint(
+            model_name='dishsimilarity',
+            constraint=models.UniqueConstraint(fields=('generation', 'dish', 'similar'), name='unique_dish_similarity'),
+        ),
+        migrations.AddIndex(
+            model_name='dishsimilarity',
+            index=models.Index(fields=['dish', 'generation', '-score'], name='dish_similarity_score_idx'),
+        ),
+    ]
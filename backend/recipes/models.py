@@ -1,7 +1,12 @@
+from uuid import uuid4
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connection, models
 from django.db.models import Q, F
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -33,6 +38,185 @@ class Product(models.Model):
         return self.name
 
 
+class Dish(models.Model):
+    title = models.CharField('Title', max_length=200)
+    description = models.TextField('Description')
+    image = models.ImageField('Image', upload_to='dishes/')
+    image_renditions = models.JSONField(
+        'Image renditions', default=dict, blank=True, editable=False
+    )
+    prep_time = models.PositiveIntegerField(
+        'Preparation time',
+        validators=[MinValueValidator(1)]
+    )
+    creator = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='dishes',
+        verbose_name='Creator'
+    )
+    categories = models.ManyToManyField(
+        Category,
+        related_name='dishes',
+        verbose_name='Categories'
+    )
+    products = models.ManyToManyField(
+        Product,
+        through='DishProduct',
+        verbose_name='Products'
+    )
+    # Поисковый документ (title — вес A, description — вес B).
+    # GIN-индексы по нему и по триграммам title создаются только
+    # в PostgreSQL, см. миграцию 0004.
+    search_vector = SearchVectorField(null=True, editable=False)
+    bookmarks_count = models.PositiveIntegerField(
+        'Bookmarks count', default=0
+    )
+    meal_plans_count = models.PositiveIntegerField(
+        'Meal plans count', default=0
+    )
+    created_at = models.DateTimeField('Created at', auto_now_add=True)
+    updated_at = models.DateTimeField('Updated at', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Dish'
+        verbose_name_plural = 'Dishes'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='dish_created_id_idx'
+            )
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not (
+            {'title', 'description'} & set(update_fields)
+        ):
+            return
+        if connection.vendor == 'postgresql':
+            Dish.objects.filter(pk=self.pk).update(
+                search_vector=(
+                    SearchVector(
+                        'title', weight='A', config=settings.SEARCH_CONFIG
+                    )
+                    + SearchVector(
+                        'description', weight='B',
+                        config=settings.SEARCH_CONFIG
+                    )
+                )
+            )
+
+
+class DishProduct(models.Model):
+    dish = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name='dish_products',
+        verbose_name='Dish'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='dish_products',
+        verbose_name='Product'
+    )
+    quantity = models.PositiveIntegerField(
+        'Quantity',
+        validators=[MinValueValidator(1)]
+    )
+
+    class Meta:
+        verbose_name = 'Dish product'
+        verbose_name_plural = 'Dish products'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dish', 'product'],
+                name='unique_dish_product'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.dish} - {self.product}'
+
+
+class Bookmark(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='bookmarks',
+        verbose_name='User'
+    )
+    dish = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name='bookmarks',
+        verbose_name='Dish'
+    )
+
+    class Meta:
+        verbose_name = 'Bookmark'
+        verbose_name_plural = 'Bookmarks'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'dish'],
+                name='unique_bookmark'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} bookmarked {self.dish}'
+
+
+class DishSimilarity(models.Model):
+    """
+    Ближайшие соседи блюда по закладкам (косинусная мера item-item).
+    Пересчитывается еженощно задачей и точечно при новых закладках.
+    Полный пересчёт пишет новое поколение рядом с опубликованным
+    (наименьшим) и переключает его удалением прежнего.
+    """
+    dish = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name='similarities',
+        verbose_name='Dish'
+    )
+    similar = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        verbose_name='Similar dish'
+    )
+    score = models.FloatField('Score')
+    generation = models.PositiveIntegerField(
+        'Generation', default=0, db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Dish similarity'
+        verbose_name_plural = 'Dish similarities'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['generation', 'dish', 'similar'],
+                name='unique_dish_similarity'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['dish', 'generation', '-score'],
+                name='dish_similarity_score_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.dish} ~ {self.similar}: {self.score:.3f}'
+
+
 class Cuisine(models.Model):
     name = models.CharField('Cuisine name', max_length=100)
     description = models.TextField('Description', blank=True)
@@ -198,6 +382,11 @@ class SavedMeal(models.Model):
         return f'{self.user} saved {self.meal}'
 
 
+def current_weekday():
+    """День недели по умолчанию для новой записи плана питания."""
+    return MealPlan.DAYS_OF_WEEK[timezone.localdate().weekday()][0]
+
+
 class MealPlan(models.Model):
     DAYS_OF_WEEK = [
         ('monday', 'Monday'),
@@ -215,31 +404,113 @@ class MealPlan(models.Model):
         related_name='meal_plans',
         verbose_name='User'
     )
-    meal = models.ForeignKey(
-        Meal,
+    dish = models.ForeignKey(
+        Dish,
         on_delete=models.CASCADE,
-        related_name='planned_for',
-        verbose_name='Meal'
+        related_name='meal_plans',
+        verbose_name='Dish'
     )
     day = models.CharField(
         'Day of week',
         max_length=9,
-        choices=DAYS_OF_WEEK
+        choices=DAYS_OF_WEEK,
+        default=current_weekday
     )
-    planned_at = models.DateTimeField('Planned at', auto_now_add=True)
 
     class Meta:
         verbose_name = 'Meal plan'
         verbose_name_plural = 'Meal plans'
         constraints = [
             models.UniqueConstraint(
-                fields=['user', 'meal', 'day'],
+                fields=['user', 'dish'],
                 name='unique_meal_plan'
             )
         ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='meal_plan_user_day_idx')
+        ]
+
+    def __str__(self):
+        return f'{self.user} planned {self.dish} for {self.day}'
+
+
+class ShoppingListItem(models.Model):
+    """
+    Сводный список покупок пользователя.
+    Сумма количеств продукта по всем блюдам из плана питания,
+    пересчитывается при изменении плана и состава блюд.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='User'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items',
+        verbose_name='Product'
+    )
+    amount = models.PositiveIntegerField('Amount')
+
+    class Meta:
+        verbose_name = 'Shopping list item'
+        verbose_name_plural = 'Shopping list items'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'product'],
+                name='unique_shopping_list_item'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.product} - {self.amount}'
+
+
+class ShoppingListJob(models.Model):
+    """
+    Фоновая выгрузка списка покупок в файл. Незавершённое задание
+    у пользователя может быть только одно; просроченные задания
+    удаляются вместе с файлами периодической задачей.
+    """
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_jobs',
+        verbose_name='User'
+    )
+    format = models.CharField('Format', max_length=10)
+    status = models.CharField(
+        'Status', max_length=7, choices=STATUSES, default=PENDING
+    )
+    file = models.FileField('File', upload_to='shopping_lists/', blank=True)
+    created_at = models.DateTimeField('Created at', auto_now_add=True)
+    expires_at = models.DateTimeField('Expires at', db_index=True)
+
+    class Meta:
+        verbose_name = 'Shopping list job'
+        verbose_name_plural = 'Shopping list jobs'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(status='pending'),
+                name='unique_pending_shopping_list_job'
+            )
+        ]
 
     def __str__(self):
-        return f'{self.user} planned {self.meal} for {self.day}'
+        return f'{self.user} {self.format} {self.status}'
 
 
 class Tag(models.Model):
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Bookmark, Dish, MealPlan
+
+User = get_user_model()
+
+
+def change_counter(model, pk, field, delta):
+    """Атомарно меняет счётчик одним UPDATE, не опускаясь ниже нуля."""
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Dish)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.creator_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Dish)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(User, instance.creator_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Bookmark)
+def increment_bookmarks_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Dish, instance.dish_id, 'bookmarks_count', 1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def decrement_bookmarks_count(sender, instance, **kwargs):
+    change_counter(Dish, instance.dish_id, 'bookmarks_count', -1)
+
+
+@receiver(post_save, sender=MealPlan)
+def increment_meal_plans_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Dish, instance.dish_id, 'meal_plans_count', 1)
+
+
+@receiver(post_delete, sender=MealPlan)
+def decrement_meal_plans_count(sender, instance, **kwargs):
+    change_counter(Dish, instance.dish_id, 'meal_plans_count', -1)
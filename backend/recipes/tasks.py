@@ -0,0 +1,57 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from users.models import ChefConnection
+from .models import Bookmark, Dish, MealPlan
+
+User = get_user_model()
+
+# (модель со счётчиком, поле, модель-источник, внешний ключ в источнике)
+COUNTERS = (
+    (User, 'followers_count', ChefConnection, 'following_id'),
+    (User, 'following_count', ChefConnection, 'follower_id'),
+    (User, 'recipes_count', Dish, 'creator_id'),
+    (Dish, 'bookmarks_count', Bookmark, 'dish_id'),
+    (Dish, 'meal_plans_count', MealPlan, 'dish_id'),
+)
+
+
+def reconcile_counter(model, field, source, foreign_key, batch_size):
+    """
+    Сверяет счётчик с COUNT по источнику одним UPDATE на пачку id,
+    возвращает число исправленных строк.
+    """
+    actual = Coalesce(Subquery(
+        source.objects.filter(**{foreign_key: OuterRef('pk')}).order_by(
+        ).values(foreign_key).annotate(count=Count('pk')).values('count')
+    ), 0)
+    fixed = 0
+    last_pk = 0
+    while True:
+        upper = next(iter(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[batch_size - 1:batch_size]
+        ), None)
+        batch = model.objects.filter(pk__gt=last_pk)
+        if upper is not None:
+            batch = batch.filter(pk__lte=upper)
+        fixed += batch.annotate(actual=actual).exclude(
+            **{field: F('actual')}
+        ).update(**{field: actual})
+        if upper is None:
+            return fixed
+        last_pk = upper
+
+
+@shared_task
+def reconcile_counters(batch_size=1000):
+    """Исправляет расхождения денормализованных счётчиков."""
+    return {
+        f'{model._meta.model_name}.{field}': reconcile_counter(
+            model, field, source, foreign_key, batch_size
+        )
+        for model, field, source, foreign_key in COUNTERS
+    }
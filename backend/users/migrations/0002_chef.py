@@ -0,0 +1,118 @@
+import django.contrib.auth.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='User',
+            new_name='Chef',
+        ),
+        migrations.AlterModelOptions(
+            name='chef',
+            options={'ordering': ['-date_joined'], 'verbose_name': 'Chef', 'verbose_name_plural': 'Chefs'},
+        ),
+        migrations.RemoveField(
+            model_name='chef',
+            name='role',
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='id',
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='password',
+            field=models.CharField(max_length=128, verbose_name='password'),
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='username',
+            field=models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username'),
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='first_name',
+            field=models.CharField(blank=True, max_length=150, verbose_name='first name'),
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='last_name',
+            field=models.CharField(blank=True, max_length=150, verbose_name='last name'),
+        ),
+        migrations.AlterField(
+            model_name='chef',
+            name='email',
+            field=models.EmailField(blank=True, max_length=254, verbose_name='email address'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='bio',
+            field=models.TextField(blank=True, verbose_name='Biography'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='avatar',
+            field=models.ImageField(blank=True, upload_to='chefs/', verbose_name='Avatar'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='avatar_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Avatar renditions'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='website',
+            field=models.URLField(blank=True, verbose_name='Website'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='location',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Location'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='is_verified',
+            field=models.BooleanField(default=False, verbose_name='Verified chef'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Followers count'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Following count'),
+        ),
+        migrations.AddField(
+            model_name='chef',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Recipes count'),
+        ),
+        migrations.CreateModel(
+            name='ChefConnection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('follower', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='following', to=settings.AUTH_USER_MODEL, verbose_name='Follower')),
+                ('following', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='followers', to=settings.AUTH_USER_MODEL, verbose_name='Following')),
+            ],
+            options={
+                'verbose_name': 'Chef connection',
+                'verbose_name_plural': 'Chef connections',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='chefconnection',
+            constraint=models.UniqueConstraint(fields=('follower', 'following'), name='unique_chef_connection'),
+        ),
+    ]
@@ -5,10 +5,14 @@ from django.db import models
 class Chef(AbstractUser):
     bio = models.TextField('Biography', blank=True)
     avatar = models.ImageField('Avatar', upload_to='chefs/', blank=True)
+    avatar_renditions = models.JSONField(
+        'Avatar renditions', default=dict, blank=True, editable=False
+    )
     website = models.URLField('Website', blank=True)
     location = models.CharField('Location', max_length=100, blank=True)
     is_verified = models.BooleanField('Verified chef', default=False)
     followers_count = models.PositiveIntegerField('Followers count', default=0)
+    following_count = models.PositiveIntegerField('Following count', default=0)
     recipes_count = models.PositiveIntegerField('Recipes count', default=0)
 
     USERNAME_FIELD = 'email'
@@ -50,10 +54,3 @@ class ChefConnection(models.Model):
 
     def __str__(self):
         return f'{self.follower} follows {self.following}'
-
-    def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
-        if is_new:
-            self.following.followers_count += 1
-            self.following.save(update_fields=['followers_count'])
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 
+from api.fields import ImageRenditionsField
 from recipes.models import Follow, Recipe
 from recipes.serializers import MealSerializer
 
@@ -12,22 +13,20 @@ Chef = get_user_model()
 class ChefProfileSerializer(serializers.ModelSerializer):
     recipes_count = serializers.IntegerField(read_only=True)
     followers_count = serializers.IntegerField(read_only=True)
-    following_count = serializers.SerializerMethodField()
+    following_count = serializers.IntegerField(read_only=True)
     is_following = serializers.SerializerMethodField()
+    avatar_renditions = ImageRenditionsField()
 
     class Meta:
         model = Chef
         fields = (
             'id', 'email', 'username', 'first_name', 'last_name',
-            'bio', 'avatar', 'website', 'location', 'is_verified',
+            'bio', 'avatar', 'avatar_renditions', 'website', 'location', 'is_verified',
             'recipes_count', 'followers_count', 'following_count',
             'is_following'
         )
         read_only_fields = ('email', 'is_verified')
 
-    def get_following_count(self, obj):
-        return obj.following.count()
-
     def get_is_following(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
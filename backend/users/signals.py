@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.signals import change_counter
+from .models import Chef, ChefConnection
+
+
+@receiver(post_save, sender=ChefConnection)
+def increment_follow_counters(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Chef, instance.following_id, 'followers_count', 1)
+        change_counter(Chef, instance.follower_id, 'following_count', 1)
+
+
+@receiver(post_delete, sender=ChefConnection)
+def decrement_follow_counters(sender, instance, **kwargs):
+    change_counter(Chef, instance.following_id, 'followers_count', -1)
+    change_counter(Chef, instance.follower_id, 'following_count', -1)
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -45,7 +46,8 @@ class ChefViewSet(viewsets.ModelViewSet):
                     {'error': 'You are already following this chef'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            chef.followers.create(follower=request.user)
+            with transaction.atomic():
+                chef.followers.create(follower=request.user)
             return Response(status=status.HTTP_201_CREATED)
         if request.method == 'DELETE':
             if not chef.followers.filter(follower=request.user).exists():
@@ -53,7 +55,8 @@ class ChefViewSet(viewsets.ModelViewSet):
                     {'error': 'You are not following this chef'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            chef.followers.filter(follower=request.user).delete()
+            with transaction.atomic():
+                chef.followers.filter(follower=request.user).delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(